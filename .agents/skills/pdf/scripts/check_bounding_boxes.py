@@ -1,70 +1,385 @@
+from collections import defaultdict
 from dataclasses import dataclass
+import hashlib
 import json
+import math
+import os
 import sys
 
+from pdf_cache import cache_path, read_json, write_json_atomic
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 # Script to check that the `fields.json` file that Claude creates when analyzing PDFs
 # does not have overlapping bounding boxes. See forms.md.
 
 
+# Two of these are created per form field, so they use __slots__ instead of a per-instance
+# __dict__ (declared by hand, as `dataclass(slots=True)` needs Python 3.10).
 @dataclass
 class RectAndField:
+    __slots__ = ("rect", "rect_type", "field")
     rect: list[float]
     rect_type: str
     field: dict
 
 
-# Returns a list of messages that are printed to stdout for Claude to read.
-def get_bounding_box_messages(fields_json_stream) -> list[str]:
-    messages = []
-    fields = json.load(fields_json_stream)
-    messages.append(f"Read {len(fields['form_fields'])} fields")
+def rects_intersect(r1, r2):
+    disjoint_horizontal = r1[0] >= r2[2] or r1[2] <= r2[0]
+    disjoint_vertical = r1[1] >= r2[3] or r1[3] <= r2[1]
+    return not (disjoint_horizontal or disjoint_vertical)
+
+
+# Uniform grid over the rects of a single page. Each rect is registered in every cell
+# it touches, so any two intersecting rects share at least one cell and only rects in
+# the same cells need to be compared.
+class GridIndex:
+    def __init__(self, rects_and_fields, indices):
+        self.rects_and_fields = rects_and_fields
+        sizes = [
+            max(abs(rects_and_fields[i].rect[2] - rects_and_fields[i].rect[0]),
+                abs(rects_and_fields[i].rect[3] - rects_and_fields[i].rect[1]))
+            for i in indices
+        ]
+        # Cells roughly the size of an average box keep both the number of cells per
+        # rect and the number of rects per cell small.
+        self.cell_size = max(sum(sizes) / len(sizes), 1) if sizes else 1
+        self.cells = defaultdict(list)
+        for i in indices:
+            for cell in self._cells_for(rects_and_fields[i].rect):
+                self.cells[cell].append(i)
+
+    def _cells_for(self, rect):
+        # min/max so that inverted boxes are still registered in the cells they span.
+        x0 = math.floor(min(rect[0], rect[2]) / self.cell_size)
+        y0 = math.floor(min(rect[1], rect[3]) / self.cell_size)
+        x1 = math.floor(max(rect[0], rect[2]) / self.cell_size)
+        y1 = math.floor(max(rect[1], rect[3]) / self.cell_size)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                yield (cx, cy)
+
+    # Returns the indices greater than `i` whose rects intersect rect `i`, in ascending order.
+    def overlapping_after(self, i):
+        rect = self.rects_and_fields[i].rect
+        candidates = set()
+        for cell in self._cells_for(rect):
+            candidates.update(j for j in self.cells.get(cell, ()) if j > i)
+        return sorted(j for j in candidates if rects_intersect(rect, self.rects_and_fields[j].rect))
+
+    # Returns all other indices whose rects intersect rect `i`, in ascending order.
+    def overlapping(self, i):
+        rect = self.rects_and_fields[i].rect
+        candidates = set()
+        for cell in self._cells_for(rect):
+            candidates.update(j for j in self.cells.get(cell, ()) if j != i)
+        return sorted(j for j in candidates if rects_intersect(rect, self.rects_and_fields[j].rect))
+
+
+# NumPy version of GridIndex: the page's rects are loaded into an (N, 4) array and the
+# intersection test from `rects_intersect` is evaluated for a whole block of rows at
+# once. Blocks are computed on demand, so checking can still stop early, and memory stays
+# at BLOCK_ROWS * N booleans.
+class NumpyIndex:
+    BLOCK_ROWS = 256
+
+    def __init__(self, rects_and_fields, indices):
+        self.indices = np.asarray(indices)
+        self.position = {i: k for k, i in enumerate(indices)}
+        rects = np.array([rects_and_fields[i].rect for i in indices], dtype=float).reshape(-1, 4)
+        self.left, self.top, self.right, self.bottom = rects.T
+        self.overlaps_by_position = {}
+
+    def _compute_block(self, start):
+        stop = min(start + self.BLOCK_ROWS, len(self.indices))
+        rows = slice(start, stop)
+        mask = (
+            (self.left[rows, None] < self.right[None, :])
+            & (self.right[rows, None] > self.left[None, :])
+            & (self.top[rows, None] < self.bottom[None, :])
+            & (self.bottom[rows, None] > self.top[None, :])
+        )
+        # Only pairs (i, j) with j > i, matching the order of the pairwise check.
+        mask &= np.arange(len(self.indices))[None, :] > np.arange(start, stop)[:, None]
+        for k in range(start, stop):
+            self.overlaps_by_position[k] = []
+        for row, col in zip(*np.nonzero(mask)):
+            self.overlaps_by_position[start + row].append(int(self.indices[col]))
+
+    def overlapping_after(self, i):
+        k = self.position[i]
+        if k not in self.overlaps_by_position:
+            self._compute_block(k - k % self.BLOCK_ROWS)
+        return self.overlaps_by_position[k]
+
 
-    def rects_intersect(r1, r2):
-        disjoint_horizontal = r1[0] >= r2[2] or r1[2] <= r2[0]
-        disjoint_vertical = r1[1] >= r2[3] or r1[3] <= r2[1]
-        return not (disjoint_horizontal or disjoint_vertical)
+# The vectorized index compares every pair on a page, so above this many rects per page
+# the grid index wins (see `check_bounding_boxes_bench.py --crossover`).
+NUMPY_MAX_RECTS = 1000
 
+
+def make_index(rects_and_fields, indices, backend):
+    if backend == "numpy" or (backend == "auto" and np is not None and len(indices) <= NUMPY_MAX_RECTS):
+        return NumpyIndex(rects_and_fields, indices)
+    return GridIndex(rects_and_fields, indices)
+
+
+def is_too_short(r):
+    return r.rect[3] - r.rect[1] < r.field["entry_text"].get("font_size", 14)
+
+
+# Returns the positions in `rects_and_fields` of entry boxes that are shorter than their
+# font size, comparing all entries at once.
+def too_short_entries(rects_and_fields, use_numpy):
+    candidates = [
+        i for i, r in enumerate(rects_and_fields)
+        if r.rect_type == "entry" and "entry_text" in r.field
+    ]
+    if not use_numpy:
+        return {i for i in candidates if is_too_short(rects_and_fields[i])}
+    rects = np.array([rects_and_fields[i].rect for i in candidates], dtype=float).reshape(-1, 4)
+    font_sizes = np.array([rects_and_fields[i].field["entry_text"].get("font_size", 14) for i in candidates], dtype=float)
+    return {candidates[k] for k in np.nonzero(rects[:, 3] - rects[:, 1] < font_sizes)[0]}
+
+
+# Yields every problem in `form_fields`, in the order the messages are reported:
+#   ("intersection", i, j) for intersecting boxes rects_and_fields[i] and rects_and_fields[j], i < j
+#   ("too_short", i) for an entry box rects_and_fields[i] that is shorter than its font size
+# rects_and_fields holds the label and then the entry box of each field, so the field
+# index of rects_and_fields[i] is i // 2.
+def iter_problems(rects_and_fields, backend="auto"):
+    if backend == "numpy" and np is None:
+        raise ImportError("The numpy backend requires NumPy to be installed")
+
+    # Boxes on different pages never conflict, so each page gets its own index.
+    indices_by_page = defaultdict(list)
+    for i, ri in enumerate(rects_and_fields):
+        indices_by_page[ri.field["page_number"]].append(i)
+    index_by_page = {page: make_index(rects_and_fields, indices, backend) for page, indices in indices_by_page.items()}
+    too_short = too_short_entries(rects_and_fields, backend == "numpy" or (backend == "auto" and np is not None))
+
+    for i, ri in enumerate(rects_and_fields):
+        for j in index_by_page[ri.field["page_number"]].overlapping_after(i):
+            yield ("intersection", i, j)
+        if i in too_short:
+            yield ("too_short", i)
+
+
+def load_rects_and_fields(fields):
     rects_and_fields = []
     for f in fields["form_fields"]:
         rects_and_fields.append(RectAndField(f["label_bounding_box"], "label", f))
         rects_and_fields.append(RectAndField(f["entry_bounding_box"], "entry", f))
+    return rects_and_fields
+
+
+# Returns a list of messages that are printed to stdout for Claude to read.
+# Checking stops once `max_messages` messages have been produced; pass None to report everything.
+# `backend` is "python", "numpy" (requires NumPy) or "auto", which uses NumPy when it is
+# installed, except on pages with so many boxes that the grid index is faster.
+def get_bounding_box_messages(fields_json_stream, max_messages=20, backend="auto") -> list[str]:
+    fields = json.load(fields_json_stream)
+    rects_and_fields = load_rects_and_fields(fields)
+    return format_messages(rects_and_fields, iter_problems(rects_and_fields, backend), max_messages)
+
+
+def format_messages(rects_and_fields, problems, max_messages=20) -> list[str]:
+    messages = []
+    messages.append(f"Read {len(rects_and_fields) // 2} fields")
 
     has_error = False
-    for i, ri in enumerate(rects_and_fields):
-        # This is O(N^2); we can optimize if it becomes a problem.
-        for j in range(i + 1, len(rects_and_fields)):
-            rj = rects_and_fields[j]
-            if ri.field["page_number"] == rj.field["page_number"] and rects_intersect(ri.rect, rj.rect):
-                has_error = True
-                if ri.field is rj.field:
-                    messages.append(f"FAILURE: intersection between label and entry bounding boxes for `{ri.field['description']}` ({ri.rect}, {rj.rect})")
-                else:
-                    messages.append(f"FAILURE: intersection between {ri.rect_type} bounding box for `{ri.field['description']}` ({ri.rect}) and {rj.rect_type} bounding box for `{rj.field['description']}` ({rj.rect})")
-                if len(messages) >= 20:
-                    messages.append("Aborting further checks; fix bounding boxes and try again")
-                    return messages
-        if ri.rect_type == "entry":
-            if "entry_text" in ri.field:
-                font_size = ri.field["entry_text"].get("font_size", 14)
-                entry_height = ri.rect[3] - ri.rect[1]
-                if entry_height < font_size:
-                    has_error = True
-                    messages.append(f"FAILURE: entry bounding box height ({entry_height}) for `{ri.field['description']}` is too short for the text content (font size: {font_size}). Increase the box height or decrease the font size.")
-                    if len(messages) >= 20:
-                        messages.append("Aborting further checks; fix bounding boxes and try again")
-                        return messages
+    for problem in problems:
+        has_error = True
+        ri = rects_and_fields[problem[1]]
+        if problem[0] == "intersection":
+            rj = rects_and_fields[problem[2]]
+            if ri.field is rj.field:
+                messages.append(f"FAILURE: intersection between label and entry bounding boxes for `{ri.field['description']}` ({ri.rect}, {rj.rect})")
+            else:
+                messages.append(f"FAILURE: intersection between {ri.rect_type} bounding box for `{ri.field['description']}` ({ri.rect}) and {rj.rect_type} bounding box for `{rj.field['description']}` ({rj.rect})")
+        else:
+            font_size = ri.field["entry_text"].get("font_size", 14)
+            entry_height = ri.rect[3] - ri.rect[1]
+            messages.append(f"FAILURE: entry bounding box height ({entry_height}) for `{ri.field['description']}` is too short for the text content (font size: {font_size}). Increase the box height or decrease the font size.")
+        if max_messages is not None and len(messages) >= max_messages:
+            messages.append("Aborting further checks; fix bounding boxes and try again")
+            return messages
 
     if not has_error:
         messages.append("SUCCESS: All bounding boxes are valid")
     return messages
 
+
+def overlap_area(r1, r2):
+    width = min(r1[2], r2[2]) - max(r1[0], r2[0])
+    height = min(r1[3], r2[3]) - max(r1[1], r2[1])
+    return max(width, 0) * max(height, 0)
+
+
+# Returns every problem at once as a JSON-serializable dict, for tools that fix all the
+# boxes in one go instead of re-running the check after every 20 messages:
+# {
+#   "num_fields": 120,
+#   "valid": false,
+#   "intersections": [
+#     {"page_number": 1, "overlap_area": 40,
+#      "first": {"field_index": 3, "box": "label", "description": "...", "rect": [...]},
+#      "second": {"field_index": 4, "box": "entry", "description": "...", "rect": [...]}},
+#   ],
+#   "too_short_entries": [
+#     {"page_number": 1, "field_index": 7, "description": "...", "rect": [...], "entry_height": 10, "font_size": 14},
+#   ]
+# }
+# `field_index` is the position of the field in the `form_fields` list.
+def get_bounding_box_report(fields_json_stream, backend="auto") -> dict:
+    fields = json.load(fields_json_stream)
+    rects_and_fields = load_rects_and_fields(fields)
+
+    def box_info(i):
+        r = rects_and_fields[i]
+        return {"field_index": i // 2, "box": r.rect_type, "description": r.field.get("description"), "rect": r.rect}
+
+    intersections = []
+    too_short_entries_report = []
+    for problem in iter_problems(rects_and_fields, backend):
+        ri = rects_and_fields[problem[1]]
+        if problem[0] == "intersection":
+            rj = rects_and_fields[problem[2]]
+            intersections.append({
+                "page_number": ri.field["page_number"],
+                "overlap_area": overlap_area(ri.rect, rj.rect),
+                "first": box_info(problem[1]),
+                "second": box_info(problem[2]),
+            })
+        else:
+            too_short_entries_report.append({
+                "page_number": ri.field["page_number"],
+                "field_index": problem[1] // 2,
+                "description": ri.field.get("description"),
+                "rect": ri.rect,
+                "entry_height": ri.rect[3] - ri.rect[1],
+                "font_size": ri.field["entry_text"].get("font_size", 14),
+            })
+
+    return {
+        "num_fields": len(fields["form_fields"]),
+        "valid": not intersections and not too_short_entries_report,
+        "intersections": intersections,
+        "too_short_entries": too_short_entries_report,
+    }
+
+
+# Incremental mode: the problems found in a run are saved to `state_path` together with
+# each field's geometry. On the next run only the fields whose hash changed are
+# re-tested, against the other boxes on their page; problems between unchanged fields
+# are reused. The messages are the same as a full check.
+INCREMENTAL_STATE_VERSION = 1
+
+
+# Everything about a field that affects its problems. Kept as plain JSON values rather
+# than hashed: comparing them directly is cheaper than serializing every field.
+def field_geometry(field):
+    entry_text = field.get("entry_text")
+    return [
+        field["page_number"],
+        field["label_bounding_box"],
+        field["entry_bounding_box"],
+        entry_text.get("font_size", 14) if entry_text is not None else None,
+    ]
+
+
+def default_state_path(fields_json_path):
+    path_hash = hashlib.sha256(os.path.abspath(fields_json_path).encode()).hexdigest()
+    return cache_path("bbox-check", path_hash)
+
+
+def _load_state(state_path, num_fields):
+    state = read_json(state_path)
+    if not isinstance(state, dict):
+        return None
+    # Index-based problems can't be reused if fields were added or removed.
+    if state.get("version") != INCREMENTAL_STATE_VERSION or len(state.get("field_geometry", [])) != num_fields:
+        return None
+    return state
+
+
+def _save_state(state_path, geometry, problems):
+    write_json_atomic(state_path, {"version": INCREMENTAL_STATE_VERSION, "field_geometry": geometry, "problems": problems})
+
+
+# Returns every problem, as `iter_problems` would in the same order, re-testing only the
+# fields that changed since the state was saved.
+def find_problems_incremental(rects_and_fields, fields, state_path, backend="auto"):
+    geometry = [field_geometry(f) for f in fields["form_fields"]]
+    state = _load_state(state_path, len(geometry))
+    if state is None:
+        problems = [list(p) for p in iter_problems(rects_and_fields, backend)]
+        _save_state(state_path, geometry, problems)
+        return problems
+
+    dirty_fields = {k for k, (old, new) in enumerate(zip(state["field_geometry"], geometry)) if old != new}
+    if not dirty_fields:
+        return state["problems"]
+
+    # Problems that only involve unchanged fields still hold.
+    problems = {
+        tuple(p) for p in state["problems"]
+        if all(i // 2 not in dirty_fields for i in p[1:])
+    }
+
+    dirty_rects = [i for k in sorted(dirty_fields) for i in (2 * k, 2 * k + 1)]
+    dirty_pages = {rects_and_fields[i].field["page_number"] for i in dirty_rects}
+    indices_by_page = defaultdict(list)
+    for i, r in enumerate(rects_and_fields):
+        if r.field["page_number"] in dirty_pages:
+            indices_by_page[r.field["page_number"]].append(i)
+    index_by_page = {page: GridIndex(rects_and_fields, indices) for page, indices in indices_by_page.items()}
+    for i in dirty_rects:
+        r = rects_and_fields[i]
+        for j in index_by_page[r.field["page_number"]].overlapping(i):
+            problems.add(("intersection", min(i, j), max(i, j)))
+        if r.rect_type == "entry" and "entry_text" in r.field and is_too_short(r):
+            problems.add(("too_short", i))
+
+    # Same order as iter_problems: by first box, intersections (by second box) before
+    # the height check.
+    ordered = sorted(problems, key=lambda p: (p[1], 0, p[2]) if p[0] == "intersection" else (p[1], 1, 0))
+    problems = [list(p) for p in ordered]
+    _save_state(state_path, geometry, problems)
+    return problems
+
+
+def get_bounding_box_messages_incremental(fields_json_path, state_path=None, max_messages=20, backend="auto") -> list[str]:
+    with open(fields_json_path) as f:
+        fields = json.load(f)
+    rects_and_fields = load_rects_and_fields(fields)
+    problems = find_problems_incremental(rects_and_fields, fields, state_path or default_state_path(fields_json_path), backend)
+    return format_messages(rects_and_fields, problems, max_messages)
+
+
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: check_bounding_boxes.py [fields.json]")
+    args = sys.argv[1:]
+    as_json = "--json" in args
+    if as_json:
+        args.remove("--json")
+    incremental = "--incremental" in args
+    if incremental:
+        args.remove("--incremental")
+    if len(args) != 1 or (as_json and incremental):
+        print("Usage: check_bounding_boxes.py [--json | --incremental] [fields.json]")
         sys.exit(1)
     # Input file should be in the `fields.json` format described in forms.md.
-    with open(sys.argv[1]) as f:
-        messages = get_bounding_box_messages(f)
-    for msg in messages:
-        print(msg)
+    if incremental:
+        for msg in get_bounding_box_messages_incremental(args[0]):
+            print(msg)
+        sys.exit(0)
+    with open(args[0]) as f:
+        if as_json:
+            print(json.dumps(get_bounding_box_report(f), indent=2))
+        else:
+            for msg in get_bounding_box_messages(f):
+                print(msg)
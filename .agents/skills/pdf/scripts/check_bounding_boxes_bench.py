@@ -0,0 +1,94 @@
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from check_bounding_boxes import RectAndField, get_bounding_box_messages
+
+
+# Times `check_bounding_boxes.py` on synthetic `fields.json` files (see forms.md) with
+# thousands of fields laid out as non-overlapping rows, which is the worst case for the
+# checker because every pair has to be ruled out.
+# Currently this is not run automatically in CI; it's just for manual checking.
+
+
+def make_fields(num_fields, fields_per_page=500, seed=0):
+    rng = random.Random(seed)
+    form_fields = []
+    for i in range(num_fields):
+        page_number = i // fields_per_page + 1
+        row = i % fields_per_page
+        # Two columns of label/entry pairs per row band.
+        column = row % 2
+        y = (row // 2) * 24 + rng.uniform(0, 2)
+        x = column * 400
+        form_fields.append({
+            "page_number": page_number,
+            "description": f"Field {i}",
+            "field_label": f"Label {i}",
+            "label_bounding_box": [x + 10, y, x + 90, y + 20],
+            "entry_bounding_box": [x + 100, y, x + 380, y + 20],
+            "entry_text": {"text": "x", "font_size": 14},
+        })
+    num_pages = (num_fields + fields_per_page - 1) // fields_per_page
+    pages = [{"page_number": p + 1, "image_width": 800, "image_height": 6000} for p in range(num_pages)]
+    return {"pages": pages, "form_fields": form_fields}
+
+
+# Times both index backends on a single page with a growing number of fields to find
+# where NumPy stops paying off; `auto` only uses it up to NUMPY_MAX_RECTS rects per page.
+def crossover(fields_per_page_sizes=(4, 8, 16, 32, 64, 128, 256, 512, 2000), repeat=20):
+    for fields_per_page in fields_per_page_sizes:
+        data = json.dumps(make_fields(fields_per_page, fields_per_page=fields_per_page))
+        timings = []
+        for backend in ("python", "numpy"):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                get_bounding_box_messages(io.StringIO(data), backend=backend)
+            timings.append((time.perf_counter() - start) / repeat * 1000)
+        print(f"{fields_per_page * 2:>6} rects/page: python {timings[0]:8.2f} ms  numpy {timings[1]:8.2f} ms")
+
+
+# Peak traced memory and time for building the RectAndField list, which is allocated
+# twice per form field.
+def memory(num_fields):
+    fields = make_fields(num_fields)["form_fields"]
+    tracemalloc.start()
+    start = time.perf_counter()
+    rects_and_fields = []
+    for f in fields:
+        rects_and_fields.append(RectAndField(f["label_bounding_box"], "label", f))
+        rects_and_fields.append(RectAndField(f["entry_bounding_box"], "entry", f))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{num_fields:>7} fields: RectAndField construction {elapsed * 1000:7.1f} ms, peak {peak / 1e6:6.2f} MB")
+
+
+def run(num_fields, backend="auto"):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "fields.json")
+        with open(path, "w") as f:
+            json.dump(make_fields(num_fields), f)
+        start = time.perf_counter()
+        with open(path) as f:
+            messages = get_bounding_box_messages(f, backend=backend)
+        elapsed = time.perf_counter() - start
+    print(f"{num_fields:>7} fields ({backend}): {elapsed * 1000:9.1f} ms  ({messages[-1]})")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--crossover"]:
+        crossover()
+        sys.exit(0)
+    if sys.argv[1:] == ["--memory"]:
+        memory(50000)
+        sys.exit(0)
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 50000]
+    for size in sizes:
+        for backend in ("python", "numpy"):
+            run(size, backend)
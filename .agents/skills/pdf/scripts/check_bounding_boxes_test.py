@@ -1,7 +1,11 @@
 import unittest
 import json
 import io
-from check_bounding_boxes import get_bounding_box_messages
+import os
+import random
+import tempfile
+import check_bounding_boxes
+from check_bounding_boxes import get_bounding_box_messages, get_bounding_box_messages_incremental, get_bounding_box_report, rects_intersect
 
 
 # Currently this is not run automatically in CI; it's just for documentation and manual checking.
@@ -220,6 +224,146 @@ class TestGetBoundingBoxMessages(unittest.TestCase):
         messages = get_bounding_box_messages(stream)
         self.assertTrue(any("SUCCESS" in msg for msg in messages))
         self.assertFalse(any("FAILURE" in msg for msg in messages))
+
+    def test_matches_pairwise_comparison(self):
+        """Test that the spatial index finds the same intersections as comparing every pair"""
+        rng = random.Random(1234)
+        fields = []
+        for i in range(150):
+            x, y = rng.uniform(0, 500), rng.uniform(0, 700)
+            w, h = rng.uniform(1, 80), rng.uniform(1, 30)
+            fields.append({
+                "description": f"Field{i}",
+                "page_number": rng.randint(1, 3),
+                "label_bounding_box": [x, y, x + w, y + h],
+                "entry_bounding_box": [x + w - 5, y, x + 2 * w, y + h],
+            })
+
+        rects = []
+        for f in fields:
+            rects.append((f["label_bounding_box"], f))
+            rects.append((f["entry_bounding_box"], f))
+        expected = 0
+        for i in range(len(rects)):
+            for j in range(i + 1, len(rects)):
+                if rects[i][1]["page_number"] == rects[j][1]["page_number"] and rects_intersect(rects[i][0], rects[j][0]):
+                    expected += 1
+
+        stream = self.create_json_stream({"form_fields": fields})
+        messages = get_bounding_box_messages(stream, max_messages=None)
+        failure_count = sum(1 for msg in messages if "FAILURE" in msg)
+        self.assertGreater(expected, 0)
+        self.assertEqual(failure_count, expected)
+
+    def test_report_lists_all_problems(self):
+        """Test that the JSON report has every problem, without the message limit"""
+        fields = []
+        for i in range(25):
+            fields.append({
+                "description": f"Field{i}",
+                "page_number": 1,
+                "label_bounding_box": [10, 10, 50, 30],
+                "entry_bounding_box": [20, 15, 60, 25],
+                "entry_text": {"font_size": 14},
+            })
+        fields.append({
+            "description": "Other page",
+            "page_number": 2,
+            "label_bounding_box": [10, 10, 50, 30],
+            "entry_bounding_box": [60, 10, 150, 40],
+        })
+
+        report = get_bounding_box_report(self.create_json_stream({"form_fields": fields}))
+        self.assertFalse(report["valid"])
+        self.assertEqual(report["num_fields"], 26)
+        # Every pair of the 50 boxes on page 1 intersects.
+        self.assertEqual(len(report["intersections"]), 50 * 49 // 2)
+        self.assertEqual(len(report["too_short_entries"]), 25)
+
+        first = report["intersections"][0]
+        self.assertEqual(first["page_number"], 1)
+        self.assertEqual(first["first"]["field_index"], 0)
+        self.assertEqual(first["first"]["box"], "label")
+        self.assertEqual(first["second"]["field_index"], 0)
+        self.assertEqual(first["second"]["box"], "entry")
+        # [10, 10, 50, 30] and [20, 15, 60, 25] overlap on 30 x 10.
+        self.assertEqual(first["overlap_area"], 300)
+        self.assertEqual(report["too_short_entries"][0]["entry_height"], 10)
+
+    def test_report_valid(self):
+        """Test that a report without problems is valid"""
+        data = {
+            "form_fields": [
+                {
+                    "description": "Name",
+                    "page_number": 1,
+                    "label_bounding_box": [10, 10, 50, 30],
+                    "entry_bounding_box": [60, 10, 150, 30],
+                }
+            ]
+        }
+        report = get_bounding_box_report(self.create_json_stream(data))
+        self.assertTrue(report["valid"])
+        self.assertEqual(report["intersections"], [])
+        self.assertEqual(report["too_short_entries"], [])
+
+    def test_incremental_matches_full_check_after_edits(self):
+        """Test that incremental revalidation reports the same messages as a full check"""
+        rng = random.Random(7)
+        fields = []
+        for i in range(200):
+            x, y = rng.uniform(0, 500), rng.uniform(0, 700)
+            fields.append({
+                "description": f"Field{i}",
+                "page_number": rng.randint(1, 3),
+                "label_bounding_box": [x, y, x + 40, y + 15],
+                "entry_bounding_box": [x + 40, y, x + 120, y + 15],
+                "entry_text": {"font_size": 12},
+            })
+
+        with tempfile.TemporaryDirectory() as tmp:
+            fields_path = os.path.join(tmp, "fields.json")
+            state_path = os.path.join(tmp, "state.json")
+            for edit in range(6):
+                if edit > 0:
+                    # Move one box, change a font size or move a field to another page.
+                    field = fields[rng.randrange(len(fields))]
+                    if edit % 3 == 0:
+                        field["page_number"] = rng.randint(1, 3)
+                    elif edit % 3 == 1:
+                        field["entry_text"]["font_size"] = 20
+                    else:
+                        x, y = rng.uniform(0, 500), rng.uniform(0, 700)
+                        field["entry_bounding_box"] = [x, y, x + 80, y + 15]
+                data = {"form_fields": fields}
+                with open(fields_path, "w") as f:
+                    json.dump(data, f)
+                for max_messages in (20, None):
+                    expected = get_bounding_box_messages(self.create_json_stream(data), max_messages, backend="python")
+                    actual = get_bounding_box_messages_incremental(fields_path, state_path, max_messages)
+                    self.assertEqual(actual, expected)
+
+    @unittest.skipIf(check_bounding_boxes.np is None, "NumPy is not installed")
+    def test_numpy_backend_matches_python_backend(self):
+        """Test that both backends produce the same messages in the same order"""
+        rng = random.Random(99)
+        fields = []
+        for i in range(400):
+            x, y = rng.uniform(0, 500), rng.uniform(0, 700)
+            w, h = rng.uniform(1, 60), rng.uniform(1, 30)
+            fields.append({
+                "description": f"Field{i}",
+                "page_number": rng.randint(1, 2),
+                "label_bounding_box": [x, y, x + w, y + h],
+                "entry_bounding_box": [x + w, y, x + 2 * w, y + h],
+                "entry_text": {"font_size": rng.choice([8, 14, 20])},
+            })
+        data = {"form_fields": fields}
+
+        for max_messages in (20, None):
+            python_messages = get_bounding_box_messages(self.create_json_stream(data), max_messages, backend="python")
+            numpy_messages = get_bounding_box_messages(self.create_json_stream(data), max_messages, backend="numpy")
+            self.assertEqual(python_messages, numpy_messages)
     
 
 if __name__ == '__main__':
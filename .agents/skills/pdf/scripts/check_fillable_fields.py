@@ -1,12 +1,87 @@
+import argparse
+import json
 import sys
-from pypdf import PdfReader
+from concurrent.futures import ProcessPoolExecutor
+
+from pypdf.generic import ArrayObject, DictionaryObject
+
+from pdf_cache import open_pdf
 
 
 # Script for Claude to run to determine whether a PDF has fillable form fields. See forms.md.
 
 
-reader = PdfReader(sys.argv[1])
-if (reader.get_fields()):
-    print("This PDF has fillable form fields")
-else:
-    print("This PDF does not have fillable form fields; you will need to visually determine where to enter data")
+# Answers from the document catalog alone, without walking the field tree: returns True
+# or False when `/AcroForm` -> `/Fields` settles the question, and None when the catalog
+# is ambiguous (e.g. malformed or unresolvable field entries).
+def probe_fillable_fields(reader):
+    try:
+        acro_form = reader.trailer["/Root"].get_object().get("/AcroForm")
+        if acro_form is None:
+            return False
+        fields = acro_form.get_object().get("/Fields")
+        if fields is None:
+            return False
+        fields = fields.get_object()
+        if not isinstance(fields, ArrayObject):
+            return None
+        if len(fields) == 0:
+            return False
+        if all(isinstance(field.get_object(), DictionaryObject) for field in fields):
+            return True
+    except Exception:
+        pass
+    return None
+
+
+# Returns (has fillable fields, method), where method is "catalog" when the probe was
+# conclusive and "full" when the whole field tree had to be walked.
+def has_fillable_fields(reader):
+    result = probe_fillable_fields(reader)
+    if result is not None:
+        return result, "catalog"
+    return bool(reader.get_fields()), "full"
+
+
+def check_pdf(pdf_path):
+    try:
+        has_fields, method = has_fillable_fields(open_pdf(pdf_path))
+    except Exception as e:
+        return {"path": pdf_path, "error": f"{type(e).__name__}: {e}"}
+    return {"path": pdf_path, "has_fillable_fields": has_fields, "method": method}
+
+
+def check_pdfs(pdf_paths, workers=None):
+    if len(pdf_paths) == 1:
+        return [check_pdf(pdf_paths[0])]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(check_pdf, pdf_paths, chunksize=max(1, len(pdf_paths) // 64)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Checks whether PDFs have fillable form fields.")
+    parser.add_argument("pdf_paths", nargs="+", metavar="file.pdf")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    parser.add_argument("--workers", type=int, help="worker processes when checking several PDFs (default: one per CPU)")
+    args = parser.parse_args()
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    results = check_pdfs(args.pdf_paths, args.workers)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    elif len(results) == 1 and "error" not in results[0]:
+        if results[0]["has_fillable_fields"]:
+            print("This PDF has fillable form fields")
+        else:
+            print("This PDF does not have fillable form fields; you will need to visually determine where to enter data")
+    else:
+        for result in results:
+            if "error" in result:
+                print(f"{result['path']}: ERROR: {result['error']}")
+            elif result["has_fillable_fields"]:
+                print(f"{result['path']}: has fillable form fields")
+            else:
+                print(f"{result['path']}: no fillable form fields")
+    if any("error" in result for result in results):
+        sys.exit(1)
@@ -1,35 +1,312 @@
+import argparse
+import io
+import math
 import os
-import sys
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
+from PIL import Image
+
+from pdf_cache import CACHE_ROOT, file_sha256, read_json, write_json_atomic
 
 
 # Converts each page of a PDF to a PNG image.
+#
+# Pages are rendered in chunks of `chunk_size` pages, optionally spread over several
+# worker processes, and each page is written to disk as soon as it has been rendered,
+# so peak memory depends on the chunk size rather than on the number of pages.
+#
+# Rendered pages are kept in an on-disk cache keyed by the PDF's content hash, the
+# page number, the DPI and `max_dim`, so converting an unchanged PDF again only links
+# or copies the cached images into the output directory.
+#
+# The DPI is chosen from the first page, so a much larger page later in the document
+# (e.g. an A0 drawing in a letter-sized PDF) would render to a very large bitmap before
+# being scaled down. Pages above `MAX_PAGE_PIXELS` are instead rendered in horizontal
+# bands of at most `MAX_BAND_PIXELS`, each band is scaled down on its own and pasted
+# into the output image, so peak memory is bounded by the band size, not the page area.
+
+
+DEFAULT_DPI = 200
+POINTS_PER_INCH = 72
+DEFAULT_CACHE_DIR = os.path.join(CACHE_ROOT, "renders")
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+MAX_PAGE_PIXELS = 16 * 1024 * 1024
+MAX_BAND_PIXELS = 4 * 1024 * 1024
+
+
+# Hard-links `src` to `dst`, falling back to a copy across filesystems. An existing
+# `dst` is removed first so that writing to it can never modify a linked cache entry.
+def link_or_copy(src, dst):
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+# Least-recently-used cache of rendered pages. Recency is tracked with file mtimes,
+# which are refreshed on every hit, and the oldest files are evicted once the
+# cache grows past `max_bytes`.
+class RenderCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _touch(self, path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    # Returns the pdfinfo output for the document, running pdfinfo only on a miss.
+    def document_info(self, pdf_path, pdf_hash):
+        info_path = os.path.join(self.cache_dir, f"{pdf_hash}.json")
+        info = read_json(info_path)
+        if info is not None:
+            self._touch(info_path)
+            return info
+        info = pdfinfo_from_path(pdf_path)
+        write_json_atomic(info_path, info)
+        return info
+
+    def page_path(self, pdf_hash, page_number, dpi, max_dim):
+        return os.path.join(self.cache_dir, f"{pdf_hash}-p{page_number}-d{dpi:g}-m{max_dim}.png")
+
+    # Copies a cached page to `output_path`; returns False on a miss.
+    def fetch(self, pdf_hash, page_number, dpi, max_dim, output_path):
+        cached_path = self.page_path(pdf_hash, page_number, dpi, max_dim)
+        if not os.path.exists(cached_path):
+            return False
+        self._touch(cached_path)
+        link_or_copy(cached_path, output_path)
+        return True
+
+    def store(self, pdf_hash, page_number, dpi, max_dim, image_path):
+        link_or_copy(image_path, self.page_path(pdf_hash, page_number, dpi, max_dim))
+
+    def evict(self):
+        entries = []
+        total_bytes = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total_bytes += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_bytes -= size
+
+
+# Returns the DPI that makes a page of `page_size` points fit in `max_dim` pixels,
+# never rendering above `DEFAULT_DPI`.
+def dpi_for_max_dim(page_size, max_dim):
+    longest_side = max(page_size)
+    if longest_side <= 0:
+        return DEFAULT_DPI
+    return min(DEFAULT_DPI, max_dim * POINTS_PER_INCH / longest_side)
+
+
+# Parses the "Page size" line reported by pdfinfo, e.g. "612 x 792 pts (letter)".
+def parse_page_size(page_size):
+    width, _, height = page_size.split()[:3]
+    return float(width), float(height)
+
+
+# Returns the size in pixels of each page from `first_page` to `last_page` when rendered
+# at `dpi`, taking the page rotation into account. Pages that pdfinfo doesn't report a
+# size for are left out.
+def rendered_page_sizes(pdf_path, first_page, last_page, dpi):
+    info = pdfinfo_from_path(pdf_path, first_page=first_page, last_page=last_page)
+    sizes = {}
+    for page_number in range(first_page, last_page + 1):
+        page_size = info.get(f"Page {page_number:4d} size")
+        if page_size is None:
+            continue
+        width, height = parse_page_size(page_size)
+        if int(info.get(f"Page {page_number:4d} rot", "0") or 0) % 180 == 90:
+            width, height = height, width
+        sizes[page_number] = (
+            math.ceil(width * dpi / POINTS_PER_INCH),
+            math.ceil(height * dpi / POINTS_PER_INCH),
+        )
+    return sizes
+
+
+# Returns the size that fits an image of `size` in `max_dim` pixels, or `size` itself
+# if it already fits.
+def fit_to_max_dim(size, max_dim):
+    width, height = size
+    if width <= max_dim and height <= max_dim:
+        return size
+    scale_factor = min(max_dim / width, max_dim / height)
+    return int(width * scale_factor), int(height * scale_factor)
+
+
+# Renders one page in horizontal bands with pdftoppm's crop options, scaling each band
+# down to the output width before rendering the next one.
+def render_page_in_bands(pdf_path, page_number, dpi, page_size, max_dim):
+    width, height = page_size
+    new_width, new_height = fit_to_max_dim(page_size, max_dim)
+    scale = new_height / height
+    # Bands must be tall enough to cover at least one output row each.
+    band_height = max(MAX_BAND_PIXELS // width, math.ceil(1 / scale), 1)
+    page_image = Image.new("RGB", (new_width, new_height), "white")
+    for top in range(0, height, band_height):
+        bottom = min(top + band_height, height)
+        command = [
+            "pdftoppm", "-r", f"{dpi:g}", "-f", str(page_number), "-l", str(page_number),
+            "-x", "0", "-y", str(top), "-W", str(width), "-H", str(bottom - top),
+            pdf_path,
+        ]
+        # Without an output file name pdftoppm writes a single PPM image to stdout.
+        output = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True).stdout
+        out_top = round(top * scale)
+        out_bottom = min(round(bottom * scale), new_height)
+        if out_bottom <= out_top:
+            continue
+        with Image.open(io.BytesIO(output)) as band:
+            page_image.paste(band.resize((new_width, out_bottom - out_top)), (0, out_top))
+    return page_image
+
+
+def save_page(output_dir, page_number, image):
+    image_path = os.path.join(output_dir, f"page_{page_number}.png")
+    # The old file may be hard-linked into the render cache; replace it rather than
+    # writing through the link.
+    if os.path.lexists(image_path):
+        os.remove(image_path)
+    image.save(image_path)
+    return page_number, image_path, image.size
+
+
+def render_chunk(pdf_path, output_dir, first_page, last_page, dpi, max_dim):
+    page_sizes = rendered_page_sizes(pdf_path, first_page, last_page, dpi)
+    banded = {
+        page_number
+        for page_number, (width, height) in page_sizes.items()
+        if width * height > MAX_PAGE_PIXELS
+    }
+
+    saved = []
+    # The chunk is split only where banded pages leave gaps, never by size.
+    unbanded = [n for n in range(first_page, last_page + 1) if n not in banded]
+    for start, end in page_chunks(unbanded, last_page - first_page + 1):
+        images = convert_from_path(pdf_path, dpi=dpi, first_page=start, last_page=end)
+        for page_number, image in zip(range(start, end + 1), images):
+            # The DPI is computed from the first page; pages with a different size can
+            # still come out too large and need to be scaled down to fit `max_dim`.
+            new_size = fit_to_max_dim(image.size, max_dim)
+            if new_size != image.size:
+                image = image.resize(new_size)
+            saved.append(save_page(output_dir, page_number, image))
+            image.close()
+    for page_number in sorted(banded):
+        image = render_page_in_bands(pdf_path, page_number, dpi, page_sizes[page_number], max_dim)
+        saved.append(save_page(output_dir, page_number, image))
+        image.close()
+    return sorted(saved)
+
+
+# Groups sorted page numbers into runs of consecutive pages at most `chunk_size` long.
+def page_chunks(page_numbers, chunk_size):
+    chunks = []
+    for page_number in page_numbers:
+        if chunks and chunks[-1][1] == page_number - 1 and chunks[-1][1] - chunks[-1][0] + 1 < chunk_size:
+            chunks[-1] = (chunks[-1][0], page_number)
+        else:
+            chunks.append((page_number, page_number))
+    return chunks
+
+
+def convert(pdf_path, output_dir, max_dim=1000, first_page=None, last_page=None, workers=1, chunk_size=4, cache=None):
+    pdf_hash = None
+    if cache:
+        pdf_hash = file_sha256(pdf_path)
+        info = cache.document_info(pdf_path, pdf_hash)
+    else:
+        info = pdfinfo_from_path(pdf_path)
+    num_pages = info["Pages"]
+    first_page = max(first_page or 1, 1)
+    last_page = min(last_page or num_pages, num_pages)
+    if first_page > last_page:
+        print(f"No pages to convert (requested {first_page}-{last_page}, document has {num_pages} pages)")
+        return
+
+    dpi = DEFAULT_DPI
+    if "Page size" in info:
+        dpi = dpi_for_max_dim(parse_page_size(info["Page size"]), max_dim)
 
+    num_converted = 0
+    pages_to_render = []
+    for page_number in range(first_page, last_page + 1):
+        image_path = os.path.join(output_dir, f"page_{page_number}.png")
+        if cache and cache.fetch(pdf_hash, page_number, dpi, max_dim, image_path):
+            # Opening only reads the PNG header, not the pixel data.
+            with Image.open(image_path) as image:
+                print(f"Saved page {page_number} as {image_path} (size: {image.size}, cached)")
+            num_converted += 1
+        else:
+            pages_to_render.append(page_number)
+    chunks = page_chunks(pages_to_render, chunk_size)
 
-def convert(pdf_path, output_dir, max_dim=1000):
-    images = convert_from_path(pdf_path, dpi=200)
+    def report(saved):
+        for page_number, image_path, size in saved:
+            if cache:
+                cache.store(pdf_hash, page_number, dpi, max_dim, image_path)
+            print(f"Saved page {page_number} as {image_path} (size: {size})")
+        return len(saved)
 
-    for i, image in enumerate(images):
-        # Scale image if needed to keep width/height under `max_dim`
-        width, height = image.size
-        if width > max_dim or height > max_dim:
-            scale_factor = min(max_dim / width, max_dim / height)
-            new_width = int(width * scale_factor)
-            new_height = int(height * scale_factor)
-            image = image.resize((new_width, new_height))
-        
-        image_path = os.path.join(output_dir, f"page_{i+1}.png")
-        image.save(image_path)
-        print(f"Saved page {i+1} as {image_path} (size: {image.size})")
+    if workers <= 1:
+        for start, end in chunks:
+            num_converted += report(render_chunk(pdf_path, output_dir, start, end, dpi, max_dim))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(render_chunk, pdf_path, output_dir, start, end, dpi, max_dim)
+                for start, end in chunks
+            ]
+            for future in as_completed(futures):
+                num_converted += report(future.result())
 
-    print(f"Converted {len(images)} pages to PNG images")
+    if cache and chunks:
+        cache.evict()
+    print(f"Converted {num_converted} pages to PNG images")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: convert_pdf_to_images.py [input pdf] [output directory]")
-        sys.exit(1)
-    pdf_path = sys.argv[1]
-    output_directory = sys.argv[2]
-    convert(pdf_path, output_directory)
+    parser = argparse.ArgumentParser(description="Converts each page of a PDF to a PNG image.")
+    parser.add_argument("pdf_path", help="input pdf")
+    parser.add_argument("output_directory", help="output directory")
+    parser.add_argument("--max-dim", type=int, default=1000, help="maximum width/height of each image in pixels (default: 1000)")
+    parser.add_argument("--first-page", type=int, help="first page to convert (1-based, default: 1)")
+    parser.add_argument("--last-page", type=int, help="last page to convert (1-based, default: last page)")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes (default: 1)")
+    parser.add_argument("--chunk-size", type=int, default=4, help="pages rendered at once by each worker (default: 4)")
+    parser.add_argument("--no-cache", action="store_true", help="always render pages instead of using the render cache")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help=f"render cache directory (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_CACHE_MAX_BYTES // (1024 * 1024), help="evict least recently used renders beyond this size (default: %(default)s)")
+    args = parser.parse_args()
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+    convert(
+        args.pdf_path,
+        args.output_directory,
+        max_dim=args.max_dim,
+        first_page=args.first_page,
+        last_page=args.last_page,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        cache=None if args.no_cache else RenderCache(args.cache_dir, args.cache_max_mb * 1024 * 1024),
+    )
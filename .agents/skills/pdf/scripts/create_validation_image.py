@@ -1,5 +1,9 @@
+import argparse
 import json
+import os
 import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
 from PIL import Image, ImageDraw
 
@@ -13,29 +17,88 @@ def create_validation_image(page_number, fields_json_path, input_path, output_pa
     with open(fields_json_path, 'r') as f:
         data = json.load(f)
 
-        img = Image.open(input_path)
-        draw = ImageDraw.Draw(img)
-        num_boxes = 0
-        
-        for field in data["form_fields"]:
-            if field["page_number"] == page_number:
-                entry_box = field['entry_bounding_box']
-                label_box = field['label_bounding_box']
-                # Draw red rectangle over entry bounding box and blue rectangle over the label.
-                draw.rectangle(entry_box, outline='red', width=2)
-                draw.rectangle(label_box, outline='blue', width=2)
-                num_boxes += 2
-        
-        img.save(output_path)
-        print(f"Created validation image at {output_path} with {num_boxes} bounding boxes")
+    page_fields = [field for field in data["form_fields"] if field["page_number"] == page_number]
+    num_boxes = draw_bounding_boxes(page_fields, input_path, output_path)
+    print(f"Created validation image at {output_path} with {num_boxes} bounding boxes")
+
+
+def draw_bounding_boxes(page_fields, input_path, output_path):
+    img = Image.open(input_path)
+    draw = ImageDraw.Draw(img)
+    num_boxes = 0
+
+    for field in page_fields:
+        entry_box = field['entry_bounding_box']
+        label_box = field['label_bounding_box']
+        # Draw red rectangle over entry bounding box and blue rectangle over the label.
+        draw.rectangle(entry_box, outline='red', width=2)
+        draw.rectangle(label_box, outline='blue', width=2)
+        num_boxes += 2
+
+    img.save(output_path)
+    return num_boxes
+
+
+# Creates the validation images for every page listed in `fields.json` in one run.
+# Page images are read from `input_dir` as `page_<n>.png` (the names written by
+# convert_pdf_to_images.py) and the overlays are written to `output_dir` as
+# `validation_<n>.png`, drawing pages in parallel across `workers` processes.
+def create_validation_images(fields_json_path, input_dir, output_dir, workers=None):
+    with open(fields_json_path, 'r') as f:
+        data = json.load(f)
+
+    fields_by_page = defaultdict(list)
+    for field in data["form_fields"]:
+        fields_by_page[field["page_number"]].append(field)
+    page_numbers = sorted({p["page_number"] for p in data.get("pages", [])} | set(fields_by_page))
+
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = []
+    for page_number in page_numbers:
+        input_path = os.path.join(input_dir, f"page_{page_number}.png")
+        if not os.path.exists(input_path):
+            print(f"Skipping page {page_number}: {input_path} not found")
+            continue
+        output_path = os.path.join(output_dir, f"validation_{page_number}.png")
+        jobs.append((page_number, fields_by_page[page_number], input_path, output_path))
+
+    total_boxes = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(draw_bounding_boxes, page_fields, input_path, output_path)
+            for _, page_fields, input_path, output_path in jobs
+        ]
+        for (page_number, _, _, output_path), future in zip(jobs, futures):
+            num_boxes = future.result()
+            print(f"Created validation image for page {page_number} at {output_path} with {num_boxes} bounding boxes")
+            total_boxes += num_boxes
+
+    print(f"Created {len(jobs)} validation images with {total_boxes} bounding boxes")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 5:
-        print("Usage: create_validation_image.py [page number] [fields.json file] [input image path] [output image path]")
-        sys.exit(1)
-    page_number = int(sys.argv[1])
-    fields_json_path = sys.argv[2]
-    input_image_path = sys.argv[3]
-    output_image_path = sys.argv[4]
-    create_validation_image(page_number, fields_json_path, input_image_path, output_image_path)
+    parser = argparse.ArgumentParser(
+        description="Draws the bounding boxes of fields.json over page images.",
+        usage="create_validation_image.py [page number] [fields.json file] [input image path] [output image path]\n"
+              "       create_validation_image.py --all [--workers N] [fields.json file] [input image directory] [output directory]",
+    )
+    parser.add_argument("paths", nargs="+", help="the page number (without --all), fields.json, the input and the output")
+    parser.add_argument("--all", action="store_true", help="create the images of every page in fields.json")
+    parser.add_argument("--workers", type=int, help="worker processes for --all (default: one per CPU)")
+    args = parser.parse_args()
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.all:
+        if len(args.paths) != 3:
+            parser.error("--all takes a fields.json file, an input image directory and an output directory")
+        create_validation_images(*args.paths, workers=args.workers)
+        sys.exit(0)
+    if args.workers is not None:
+        parser.error("--workers can only be used with --all")
+    if len(args.paths) != 4:
+        parser.error("expected a page number, a fields.json file, an input image path and an output image path")
+    try:
+        page_number = int(args.paths[0])
+    except ValueError:
+        parser.error(f"invalid page number: {args.paths[0]!r}")
+    create_validation_image(page_number, *args.paths[1:])
@@ -3,6 +3,8 @@ import sys
 
 from pypdf import PdfReader
 
+from pdf_cache import cache_path, file_sha256, open_pdf, read_json, write_json_atomic
+
 
 # Extracts data for the fillable form fields in a PDF and outputs JSON that
 # Claude uses to fill the fields. See forms.md.
@@ -19,6 +21,63 @@ def get_full_annotation_field_id(annotation):
     return ".".join(reversed(components)) if components else None
 
 
+# Memoized version of `get_full_annotation_field_id`. Widgets of the same field tree share
+# their `/Parent` chain, so each parent's name is resolved once and reused by its children.
+class FieldIdResolver:
+    def __init__(self):
+        # id() of the resolved node -> (node, full name). The node is kept alive so its
+        # id can't be reused by another object.
+        self._names = {}
+
+    def full_id(self, annotation):
+        # Walk up until reaching a node whose name is already known (or the root).
+        chain = []
+        seen = set()
+        node = annotation.get_object() if annotation else None
+        while node is not None and id(node) not in self._names and id(node) not in seen:
+            seen.add(id(node))
+            chain.append(node)
+            parent = node.get('/Parent')
+            node = parent.get_object() if parent else None
+        name = self._names[id(node)][1] if node is not None and id(node) in self._names else None
+
+        # Then resolve the names back down the chain, caching each of them.
+        for node in reversed(chain):
+            field_name = node.get('/T')
+            if field_name:
+                name = f"{name}.{field_name}" if name else str(field_name)
+            self._names[id(node)] = (node, name)
+        return name
+
+
+# One pass over the `/Annots` of every page, mapping each fully qualified field id to its
+# widget annotations as (1-based page number, annotation) pairs in document order.
+# Scripts that need to know where a field is can build this once and then look fields up
+# directly instead of walking the pages again.
+class AnnotationIndex:
+    def __init__(self, reader: PdfReader, resolver: FieldIdResolver = None):
+        self.resolver = resolver or FieldIdResolver()
+        self.widgets_by_field_id = {}
+        for page_index, page in enumerate(reader.pages):
+            for ann in page.get('/Annots', []):
+                field_id = self.resolver.full_id(ann)
+                if field_id is None:
+                    continue
+                self.widgets_by_field_id.setdefault(field_id, []).append((page_index + 1, ann))
+
+    def widgets(self, field_id):
+        return self.widgets_by_field_id.get(field_id, [])
+
+    # Returns (page number, rect) for a field, using its last widget like `get_field_info`,
+    # or None if the field has no widget annotation.
+    def page_and_rect(self, field_id):
+        widgets = self.widgets(field_id)
+        if not widgets:
+            return None
+        page_number, ann = widgets[-1]
+        return page_number, ann.get('/Rect')
+
+
 def make_field_dict(field, field_id):
     field_dict = {"field_id": field_id}
     ft = field.get('/FT')
@@ -59,7 +118,7 @@ def make_field_dict(field, field_id):
 #     // Per-type additional fields described in forms.md
 #   },
 # ]
-def get_field_info(reader: PdfReader):
+def get_field_info(reader: PdfReader, annotation_index: AnnotationIndex = None):
     fields = reader.get_fields()
 
     field_info_by_id = {}
@@ -81,12 +140,12 @@ def get_field_info(reader: PdfReader):
     # See https://westhealth.github.io/exploring-fillable-forms-with-pdfrw.html
     radio_fields_by_id = {}
 
-    for page_index, page in enumerate(reader.pages):
-        annotations = page.get('/Annots', [])
-        for ann in annotations:
-            field_id = get_full_annotation_field_id(ann)
+    if annotation_index is None:
+        annotation_index = AnnotationIndex(reader)
+    for field_id, widgets in annotation_index.widgets_by_field_id.items():
+        for page_number, ann in widgets:
             if field_id in field_info_by_id:
-                field_info_by_id[field_id]["page"] = page_index + 1
+                field_info_by_id[field_id]["page"] = page_number
                 field_info_by_id[field_id]["rect"] = ann.get('/Rect')
             elif field_id in possible_radio_names:
                 try:
@@ -101,7 +160,7 @@ def get_field_info(reader: PdfReader):
                         radio_fields_by_id[field_id] = {
                             "field_id": field_id,
                             "type": "radio_group",
-                            "page": page_index + 1,
+                            "page": page_number,
                             "radio_options": [],
                         }
                     # Note: at least on macOS 15.7, Preview.app doesn't show selected
@@ -137,9 +196,35 @@ def get_field_info(reader: PdfReader):
     return sorted_fields
 
 
+# Bump when the output of `get_field_info` changes so that older cache files are ignored.
+FIELD_INFO_CACHE_VERSION = 1
+
+
+# The output of `get_field_info` is cached by PDF content hash so that later scripts
+# working on the same file (e.g. fill_fillable_fields.py) can skip the field walk.
+def load_cached_field_info(pdf_hash: str):
+    cached = read_json(cache_path("field-info", pdf_hash))
+    if not cached or cached.get("version") != FIELD_INFO_CACHE_VERSION or cached.get("pdf_sha256") != pdf_hash:
+        return None
+    return cached["fields"]
+
+
+def store_cached_field_info(pdf_hash: str, field_info):
+    try:
+        write_json_atomic(cache_path("field-info", pdf_hash), {
+            "version": FIELD_INFO_CACHE_VERSION,
+            "pdf_sha256": pdf_hash,
+            "fields": field_info,
+        })
+    except OSError as e:
+        # The cache is only an optimization.
+        print(f"Unable to write field info cache: {e}")
+
+
 def write_field_info(pdf_path: str, json_output_path: str):
-    reader = PdfReader(pdf_path)
+    reader = open_pdf(pdf_path)
     field_info = get_field_info(reader)
+    store_cached_field_info(file_sha256(pdf_path), field_info)
     with open(json_output_path, "w") as f:
         json.dump(field_info, f, indent=2)
     print(f"Wrote {len(field_info)} fields to {json_output_path}")
@@ -0,0 +1,104 @@
+import io
+import sys
+import time
+
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import ArrayObject, DictionaryObject, FloatObject, NameObject, NumberObject, TextStringObject
+
+from extract_form_field_info import AnnotationIndex, get_field_info, get_full_annotation_field_id
+
+
+# Times field extraction on a synthetic form whose text widgets sit at the bottom of a
+# nested field tree (section.group.subgroup.field), so every widget has a deep `/Parent`
+# chain shared with its siblings.
+# Currently this is not run automatically in CI; it's just for manual checking.
+
+
+def make_form(num_widgets, widgets_per_page=100, depth=3, fanout=10):
+    writer = PdfWriter()
+    num_pages = (num_widgets + widgets_per_page - 1) // widgets_per_page
+    for _ in range(num_pages):
+        writer.add_blank_page(612, 792)
+
+    root_fields = ArrayObject()
+    parents = {}
+
+    def parent_for(path):
+        # Creates the intermediate (non-terminal) fields for `path` on demand.
+        if path in parents:
+            return parents[path]
+        node = DictionaryObject({NameObject("/T"): TextStringObject(path[-1]), NameObject("/Kids"): ArrayObject()})
+        ref = writer._add_object(node)
+        if len(path) > 1:
+            parent_ref = parent_for(path[:-1])
+            node[NameObject("/Parent")] = parent_ref
+            parent_ref.get_object()["/Kids"].append(ref)
+        else:
+            root_fields.append(ref)
+        parents[path] = ref
+        return ref
+
+    for i in range(num_widgets):
+        path = tuple(f"g{(i // fanout ** (depth - level)) % fanout}" for level in range(depth))
+        parent_ref = parent_for(path)
+        page = writer.pages[i // widgets_per_page]
+        row = i % widgets_per_page
+        y = 760 - (row // 2) * 15
+        x = 40 + (row % 2) * 280
+        widget = DictionaryObject({
+            NameObject("/Type"): NameObject("/Annot"),
+            NameObject("/Subtype"): NameObject("/Widget"),
+            NameObject("/FT"): NameObject("/Tx"),
+            NameObject("/T"): TextStringObject(f"field{i}"),
+            NameObject("/Parent"): parent_ref,
+            NameObject("/Rect"): ArrayObject([FloatObject(x), FloatObject(y), FloatObject(x + 250), FloatObject(y + 12)]),
+            NameObject("/F"): NumberObject(4),
+        })
+        widget_ref = writer._add_object(widget)
+        widget[NameObject("/P")] = page.indirect_reference
+        parent_ref.get_object()["/Kids"].append(widget_ref)
+        if "/Annots" not in page:
+            page[NameObject("/Annots")] = ArrayObject()
+        page["/Annots"].append(widget_ref)
+
+    writer._root_object[NameObject("/AcroForm")] = DictionaryObject({NameObject("/Fields"): root_fields})
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def run(num_widgets):
+    data = make_form(num_widgets)
+
+    # Resolving every annotation's name from scratch, as get_field_info used to.
+    reader = PdfReader(io.BytesIO(data))
+    _ = [ann.get_object() for page in reader.pages for ann in page.get('/Annots', [])]
+    _, uncached_ms = timed(lambda: [
+        get_full_annotation_field_id(ann) for page in reader.pages for ann in page.get('/Annots', [])
+    ])
+
+    reader = PdfReader(io.BytesIO(data))
+    _ = [ann.get_object() for page in reader.pages for ann in page.get('/Annots', [])]
+    index, index_ms = timed(lambda: AnnotationIndex(reader))
+    _, lookup_ms = timed(lambda: [index.page_and_rect(f"g0.g0.g0.field{i}") for i in range(10)])
+
+    reader = PdfReader(io.BytesIO(data))
+    field_info, field_info_ms = timed(lambda: get_field_info(reader))
+
+    print(f"{num_widgets} widgets, {len(field_info)} fields")
+    print(f"  uncached name resolution: {uncached_ms:9.1f} ms")
+    print(f"  annotation index:         {index_ms:9.1f} ms")
+    print(f"  10 page/rect lookups:     {lookup_ms:9.3f} ms")
+    print(f"  get_field_info (total):   {field_info_ms:9.1f} ms")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [5000]
+    for size in sizes:
+        run(size)
@@ -1,50 +1,112 @@
+import argparse
+import io
 import json
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 from pypdf import PdfReader, PdfWriter
 
-from extract_form_field_info import get_field_info
+from extract_form_field_info import get_field_info, load_cached_field_info, store_cached_field_info
+from pdf_cache import file_sha256, open_pdf
 
 
 # Fills fillable form fields in a PDF. See forms.md.
 
 
-def fill_pdf_fields(input_pdf_path: str, fields_json_path: str, output_pdf_path: str):
+# Returns the `get_field_info` output for the PDF, reusing the copy cached by
+# extract_form_field_info.py when the file hasn't changed since.
+def field_info_for_pdf(input_pdf_path: str, reader: PdfReader, use_cache: bool = True):
+    if not use_cache:
+        return get_field_info(reader)
+    pdf_hash = file_sha256(input_pdf_path)
+    field_info = load_cached_field_info(pdf_hash)
+    if field_info is None:
+        field_info = get_field_info(reader)
+        store_cached_field_info(pdf_hash, field_info)
+    return field_info
+
+
+def fill_pdf_fields(input_pdf_path: str, fields_json_path: str, output_pdf_path: str, use_cache: bool = True, incremental: bool = False):
     with open(fields_json_path) as f:
         fields = json.load(f)
-    # Group by page number.
-    fields_by_page = {}
-    for field in fields:
-        if "value" in field:
-            field_id = field["field_id"]
-            page = field["page"]
-            if page not in fields_by_page:
-                fields_by_page[page] = {}
-            fields_by_page[page][field_id] = field["value"]
-    
-    reader = PdfReader(input_pdf_path)
 
-    has_error = False
-    field_info = get_field_info(reader)
+    reader = open_pdf(input_pdf_path)
+
+    field_info = field_info_for_pdf(input_pdf_path, reader, use_cache)
     fields_by_ids = {f["field_id"]: f for f in field_info}
+    errors = validation_errors(fields, fields_by_ids)
+    for err in errors:
+        print(err)
+    if errors:
+        sys.exit(1)
+
+    write_filled_pdf(reader, fields, output_pdf_path, incremental)
+
+
+# Returns the error messages for the entries of a `field_values.json` list that don't
+# match the fields of the PDF (as returned by `get_field_info`, keyed by field id).
+def validation_errors(fields, fields_by_ids):
+    errors = []
     for field in fields:
         existing_field = fields_by_ids.get(field["field_id"])
         if not existing_field:
-            has_error = True
-            print(f"ERROR: `{field['field_id']}` is not a valid field ID")
+            errors.append(f"ERROR: `{field['field_id']}` is not a valid field ID")
         elif field["page"] != existing_field["page"]:
-            has_error = True
-            print(f"ERROR: Incorrect page number for `{field['field_id']}` (got {field['page']}, expected {existing_field['page']})")
+            errors.append(f"ERROR: Incorrect page number for `{field['field_id']}` (got {field['page']}, expected {existing_field['page']})")
         else:
             if "value" in field:
                 err = validation_error_for_field_value(existing_field, field["value"])
                 if err:
-                    print(err)
-                    has_error = True
-    if has_error:
-        sys.exit(1)
+                    errors.append(err)
+    return errors
 
-    writer = PdfWriter(clone_from=reader)
+
+# Returns an error message if a batch record isn't a list of fields or an object with a
+# "fields" list and an optional "output" file name, or if any of its fields isn't an
+# object with a "field_id" and a "page"; None if the shape is fine. The output name must
+# be a plain file name so that records can only write inside the output directory.
+def record_shape_error(record):
+    if isinstance(record, dict):
+        if "fields" not in record:
+            return 'object records need a "fields" list'
+        output = record.get("output")
+        if output is not None:
+            separators = [sep for sep in (os.sep, os.altsep, "/") if sep]
+            if not isinstance(output, str) or output in ("", ".", "..") or any(sep in output for sep in separators):
+                return f'"output" must be a plain file name, got {json.dumps(output)}'
+        fields = record["fields"]
+    else:
+        fields = record
+    if not isinstance(fields, list):
+        return 'expected a list of fields or an object with a "fields" list'
+    for i, field in enumerate(fields):
+        if not isinstance(field, dict):
+            return f"field {i} is not an object"
+        missing = [key for key in ("field_id", "page") if key not in field]
+        if missing:
+            return f"field {i} is missing {', '.join(repr(key) for key in missing)}"
+    return None
+
+
+# With `incremental`, the original file is copied unchanged and only the modified field
+# and appearance objects are appended as an incremental update, instead of serializing
+# the whole document again.
+def write_filled_pdf(reader: PdfReader, fields, output_pdf_path: str, incremental: bool = False):
+    # Group by page number.
+    fields_by_page = {}
+    for field in fields:
+        if "value" in field:
+            field_id = field["field_id"]
+            page = field["page"]
+            if page not in fields_by_page:
+                fields_by_page[page] = {}
+            fields_by_page[page][field_id] = field["value"]
+
+    if incremental:
+        writer = PdfWriter(reader, incremental=True)
+    else:
+        writer = PdfWriter(clone_from=reader)
     for page, field_values in fields_by_page.items():
         writer.update_page_form_field_values(writer.pages[page - 1], field_values, auto_regenerate=False)
 
@@ -56,6 +118,105 @@ def fill_pdf_fields(input_pdf_path: str, fields_json_path: str, output_pdf_path:
         writer.write(f)
 
 
+# Batch mode: fills one template with many value sets. `records_jsonl_path` has one
+# record per line, either a `field_values.json` list or an object with a "fields" list
+# and an optional "output" file name. The template is parsed and validated against once;
+# each valid record is written to `output_dir` (as `record_<line number>.pdf` unless it
+# names its output), and invalid records are reported and skipped.
+def fill_pdf_fields_batch(input_pdf_path: str, records_jsonl_path: str, output_dir: str, workers: int = 1, use_cache: bool = True, incremental: bool = False):
+    with open(input_pdf_path, "rb") as f:
+        pdf_bytes = f.read()
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    field_info = field_info_for_pdf(input_pdf_path, reader, use_cache)
+    fields_by_ids = {f["field_id"]: f for f in field_info}
+
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = []
+    # Output file name -> line of the record that writes it, to reject duplicates.
+    output_lines = {}
+    num_records = 0
+    num_invalid = 0
+    with open(records_jsonl_path) as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            num_records += 1
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                print(f"Record on line {line_number}: ERROR: not valid JSON: {e}")
+                num_invalid += 1
+                continue
+            shape_error = record_shape_error(record)
+            if shape_error:
+                num_invalid += 1
+                print(f"Record on line {line_number}: ERROR: {shape_error}")
+                continue
+            if isinstance(record, dict):
+                fields = record["fields"]
+                output_name = record.get("output") or f"record_{line_number}.pdf"
+            else:
+                fields = record
+                output_name = f"record_{line_number}.pdf"
+            if output_name in output_lines:
+                num_invalid += 1
+                print(f"Record on line {line_number}: ERROR: output `{output_name}` is already used by the record on line {output_lines[output_name]}")
+                continue
+            errors = validation_errors(fields, fields_by_ids)
+            if errors:
+                num_invalid += 1
+                for err in errors:
+                    print(f"Record on line {line_number}: {err}")
+                continue
+            output_lines[output_name] = line_number
+            jobs.append((line_number, fields, os.path.join(output_dir, output_name)))
+
+    num_written = 0
+    if workers <= 1:
+        for line_number, fields, output_path in jobs:
+            try:
+                write_filled_pdf(reader, fields, output_path, incremental)
+            except Exception as e:
+                num_invalid += 1
+                print(f"Record on line {line_number}: ERROR: failed to write {output_path}: {e}")
+                continue
+            print(f"Wrote {output_path}")
+            num_written += 1
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker, initargs=(pdf_bytes,)) as executor:
+            futures = {
+                executor.submit(_fill_batch_record, fields, output_path, incremental): (line_number, output_path)
+                for line_number, fields, output_path in jobs
+            }
+            for future in as_completed(futures):
+                line_number, output_path = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    num_invalid += 1
+                    print(f"Record on line {line_number}: ERROR: failed to write {output_path}: {e}")
+                    continue
+                print(f"Wrote {output_path}")
+                num_written += 1
+
+    print(f"Filled {num_written} of {num_records} records into {output_dir} ({num_invalid} with errors)")
+    return num_invalid == 0
+
+
+# Each batch worker parses the template once and reuses it for all of its records.
+_batch_reader = None
+
+
+def _init_batch_worker(pdf_bytes):
+    global _batch_reader
+    monkeypatch_pydpf_method()
+    _batch_reader = PdfReader(io.BytesIO(pdf_bytes))
+
+
+def _fill_batch_record(fields, output_path, incremental):
+    write_filled_pdf(_batch_reader, fields, output_path, incremental)
+
+
 def validation_error_for_field_value(field_info, field_value):
     field_type = field_info["type"]
     field_id = field_info["field_id"]
@@ -91,6 +252,10 @@ def monkeypatch_pydpf_method():
     from pypdf.generic import DictionaryObject
     from pypdf.constants import FieldDictionaryAttributes
 
+    # Long-running callers (batch workers, pdf_worker.py) may call this repeatedly.
+    if getattr(DictionaryObject.get_inherited, "_opt_patched", False):
+        return
+
     original_get_inherited = DictionaryObject.get_inherited
 
     def patched_get_inherited(self, key: str, default = None):
@@ -100,15 +265,25 @@ def monkeypatch_pydpf_method():
                 result = [r[0] for r in result]
         return result
 
+    patched_get_inherited._opt_patched = True
     DictionaryObject.get_inherited = patched_get_inherited
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 4:
-        print("Usage: fill_fillable_fields.py [input pdf] [field_values.json] [output pdf]")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description="Fills fillable form fields in a PDF.",
+        usage="fill_fillable_fields.py [input pdf] [field_values.json] [output pdf]\n"
+              "       fill_fillable_fields.py --batch [--workers N] [input pdf] [records.jsonl] [output directory]",
+    )
+    parser.add_argument("input_pdf")
+    parser.add_argument("fields_json", help="field_values.json, or a JSONL file of value sets with --batch")
+    parser.add_argument("output", help="output pdf, or an output directory with --batch")
+    parser.add_argument("--batch", action="store_true", help="fill the template once per line of a JSONL file")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes for --batch (default: 1)")
+    parser.add_argument("--incremental", action="store_true", help="append the changes as an incremental update instead of rewriting the whole PDF")
+    args = parser.parse_args()
     monkeypatch_pydpf_method()
-    input_pdf = sys.argv[1]
-    fields_json = sys.argv[2]
-    output_pdf = sys.argv[3]
-    fill_pdf_fields(input_pdf, fields_json, output_pdf)
+    if args.batch:
+        ok = fill_pdf_fields_batch(args.input_pdf, args.fields_json, args.output, workers=args.workers, incremental=args.incremental)
+        sys.exit(0 if ok else 1)
+    fill_pdf_fields(args.input_pdf, args.fields_json, args.output, incremental=args.incremental)
@@ -0,0 +1,63 @@
+import io
+import os
+import sys
+import tempfile
+import time
+
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject, NumberObject
+
+from extract_form_field_info_bench import make_form
+from fill_fillable_fields import monkeypatch_pydpf_method, write_filled_pdf
+
+
+# Compares a full rewrite with an incremental update when filling a few text fields of a
+# large form. Every page gets an uncompressed grayscale image so that the file size is
+# dominated by page content, as it is for scanned forms.
+# Currently this is not run automatically in CI; it's just for manual checking.
+
+
+def add_scanned_images(pdf_bytes, image_side):
+    writer = PdfWriter(clone_from=PdfReader(io.BytesIO(pdf_bytes)))
+    for page in writer.pages:
+        image = DecodedStreamObject()
+        image.set_data(os.urandom(image_side * image_side))
+        image.update({
+            NameObject("/Type"): NameObject("/XObject"),
+            NameObject("/Subtype"): NameObject("/Image"),
+            NameObject("/Width"): NumberObject(image_side),
+            NameObject("/Height"): NumberObject(image_side),
+            NameObject("/ColorSpace"): NameObject("/DeviceGray"),
+            NameObject("/BitsPerComponent"): NumberObject(8),
+        })
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/XObject"): DictionaryObject({NameObject("/Im0"): writer._add_object(image)}),
+        })
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+def run(num_widgets, image_side, num_values):
+    pdf_bytes = add_scanned_images(make_form(num_widgets), image_side)
+    # The first ten widgets of the synthetic form are g0.g0.g0.field0-9, all on page 1.
+    fields = [{"field_id": f"g0.g0.g0.field{i}", "page": 1, "value": f"value {i}"} for i in range(min(num_values, 10))]
+    print(f"{len(pdf_bytes) / 1e6:.1f} MB input, {num_widgets} widgets, {num_values} values filled")
+    with tempfile.TemporaryDirectory() as tmp:
+        for incremental in (False, True):
+            reader = PdfReader(io.BytesIO(pdf_bytes))
+            output_path = os.path.join(tmp, f"out_{incremental}.pdf")
+            start = time.perf_counter()
+            write_filled_pdf(reader, fields, output_path, incremental=incremental)
+            elapsed = time.perf_counter() - start
+            size = os.path.getsize(output_path)
+            label = "incremental" if incremental else "full rewrite"
+            appended = f", {size - len(pdf_bytes)} bytes appended" if incremental else ""
+            print(f"  {label:12}: {elapsed * 1000:8.1f} ms, {size} bytes written{appended}")
+
+
+if __name__ == "__main__":
+    monkeypatch_pydpf_method()
+    num_widgets = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    image_side = int(sys.argv[2]) if len(sys.argv) > 2 else 1500
+    run(num_widgets, image_side, num_values=5)
@@ -1,28 +1,27 @@
 import json
 import sys
+from collections import defaultdict
 
-from pypdf import PdfReader, PdfWriter
+from pypdf import PdfWriter
 from pypdf.annotations import FreeText
 
+from pdf_cache import open_pdf
+
 
 # Fills a PDF by adding text annotations defined in `fields.json`. See forms.md.
 
 
-def transform_coordinates(bbox, image_width, image_height, pdf_width, pdf_height):
-    """Transform bounding box from image coordinates to PDF coordinates"""
+def transform_boxes(bboxes, image_width, image_height, pdf_width, pdf_height):
+    """Transform all bounding boxes of one page from image to PDF coordinates"""
     # Image coordinates: origin at top-left, y increases downward
     # PDF coordinates: origin at bottom-left, y increases upward
     x_scale = pdf_width / image_width
     y_scale = pdf_height / image_height
-    
-    left = bbox[0] * x_scale
-    right = bbox[2] * x_scale
-    
-    # Flip Y coordinates for PDF
-    top = pdf_height - (bbox[1] * y_scale)
-    bottom = pdf_height - (bbox[3] * y_scale)
-    
-    return left, bottom, right, top
+    # Returns (left, bottom, right, top) for each box, flipping the Y coordinates
+    return [
+        (bbox[0] * x_scale, pdf_height - (bbox[3] * y_scale), bbox[2] * x_scale, pdf_height - (bbox[1] * y_scale))
+        for bbox in bboxes
+    ]
 
 
 def fill_pdf_form(input_pdf_path, fields_json_path, output_pdf_path):
@@ -33,61 +32,63 @@ def fill_pdf_form(input_pdf_path, fields_json_path, output_pdf_path):
         fields_data = json.load(f)
     
     # Open the PDF
-    reader = PdfReader(input_pdf_path)
+    reader = open_pdf(input_pdf_path)
     writer = PdfWriter()
     
     # Copy all pages to writer
     writer.append(reader)
     
-    # Get PDF dimensions for each page
-    pdf_dimensions = {}
-    for i, page in enumerate(reader.pages):
-        mediabox = page.mediabox
-        pdf_dimensions[i + 1] = [mediabox.width, mediabox.height]
-    
-    # Process each form field
-    annotations = []
+    # Group the fields that have text by page, so that each page's dimensions are
+    # looked up and its scale factors computed only once.
+    pages_by_number = {p["page_number"]: p for p in fields_data["pages"]}
+    fields_by_page = defaultdict(list)
     for field in fields_data["form_fields"]:
-        page_num = field["page_number"]
-        
-        # Get page dimensions and transform coordinates.
-        page_info = next(p for p in fields_data["pages"] if p["page_number"] == page_num)
-        image_width = page_info["image_width"]
-        image_height = page_info["image_height"]
-        pdf_width, pdf_height = pdf_dimensions[page_num]
-        
-        transformed_entry_box = transform_coordinates(
-            field["entry_bounding_box"],
-            image_width, image_height,
-            pdf_width, pdf_height
-        )
-        
         # Skip empty fields
         if "entry_text" not in field or "text" not in field["entry_text"]:
             continue
-        entry_text = field["entry_text"]
-        text = entry_text["text"]
-        if not text:
+        if not field["entry_text"]["text"]:
             continue
-        
-        font_name = entry_text.get("font", "Arial")
-        font_size = str(entry_text.get("font_size", 14)) + "pt"
-        font_color = entry_text.get("font_color", "000000")
+        fields_by_page[field["page_number"]].append(field)
 
-        # Font size/color seems to not work reliably across viewers:
-        # https://github.com/py-pdf/pypdf/issues/2084
-        annotation = FreeText(
-            text=text,
-            rect=transformed_entry_box,
-            font=font_name,
-            font_size=font_size,
-            font_color=font_color,
-            border_color=None,
-            background_color=None,
+    # Get PDF dimensions for the pages that have fields
+    pdf_dimensions = {}
+    for page_num in fields_by_page:
+        mediabox = reader.pages[page_num - 1].mediabox
+        pdf_dimensions[page_num] = [mediabox.width, mediabox.height]
+
+    # Process each form field
+    annotations = []
+    for page_num, page_fields in fields_by_page.items():
+        page_info = pages_by_number[page_num]
+        pdf_width, pdf_height = pdf_dimensions[page_num]
+        transformed_entry_boxes = transform_boxes(
+            [field["entry_bounding_box"] for field in page_fields],
+            page_info["image_width"], page_info["image_height"],
+            pdf_width, pdf_height
         )
-        annotations.append(annotation)
-        # page_number is 0-based for pypdf
-        writer.add_annotation(page_number=page_num - 1, annotation=annotation)
+
+        for field, transformed_entry_box in zip(page_fields, transformed_entry_boxes):
+            entry_text = field["entry_text"]
+            text = entry_text["text"]
+
+            font_name = entry_text.get("font", "Arial")
+            font_size = str(entry_text.get("font_size", 14)) + "pt"
+            font_color = entry_text.get("font_color", "000000")
+
+            # Font size/color seems to not work reliably across viewers:
+            # https://github.com/py-pdf/pypdf/issues/2084
+            annotation = FreeText(
+                text=text,
+                rect=transformed_entry_box,
+                font=font_name,
+                font_size=font_size,
+                font_color=font_color,
+                border_color=None,
+                background_color=None,
+            )
+            annotations.append(annotation)
+            # page_number is 0-based for pypdf
+            writer.add_annotation(page_number=page_num - 1, annotation=annotation)
         
     # Save the filled PDF
     with open(output_pdf_path, "wb") as output:
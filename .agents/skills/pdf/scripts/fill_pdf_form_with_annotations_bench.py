@@ -0,0 +1,58 @@
+import json
+import os
+import sys
+import tempfile
+import time
+
+from pypdf import PdfWriter
+
+from fill_pdf_form_with_annotations import fill_pdf_form
+
+
+# Times `fill_pdf_form` on a blank PDF with a synthetic `fields.json` (see forms.md) that
+# has the same number of fields on every page, half of them with text to add.
+# Currently this is not run automatically in CI; it's just for manual checking.
+
+
+def make_fields(num_pages, fields_per_page):
+    pages = [{"page_number": p + 1, "image_width": 1000, "image_height": 1294} for p in range(num_pages)]
+    form_fields = []
+    for p in range(num_pages):
+        for i in range(fields_per_page):
+            y = (i // 2) * 12 + 10
+            x = (i % 2) * 500
+            field = {
+                "page_number": p + 1,
+                "description": f"Field {p}-{i}",
+                "field_label": f"Label {i}",
+                "label_bounding_box": [x + 10, y, x + 90, y + 10],
+                "entry_bounding_box": [x + 100, y, x + 480, y + 10],
+            }
+            if i % 2 == 0:
+                field["entry_text"] = {"text": f"value {i}", "font_size": 8}
+            form_fields.append(field)
+    return {"pages": pages, "form_fields": form_fields}
+
+
+def run(num_pages, fields_per_page):
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, "blank.pdf")
+        fields_path = os.path.join(tmp, "fields.json")
+        output_path = os.path.join(tmp, "filled.pdf")
+        writer = PdfWriter()
+        for _ in range(num_pages):
+            writer.add_blank_page(612, 792)
+        writer.write(pdf_path)
+        with open(fields_path, "w") as f:
+            json.dump(make_fields(num_pages, fields_per_page), f)
+
+        start = time.perf_counter()
+        fill_pdf_form(pdf_path, fields_path, output_path)
+        elapsed = time.perf_counter() - start
+    print(f"{num_pages} pages x {fields_per_page} fields: {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    num_pages = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    fields_per_page = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    run(num_pages, fields_per_page)
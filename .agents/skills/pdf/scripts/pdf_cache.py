@@ -0,0 +1,60 @@
+import hashlib
+import json
+import os
+
+
+# Helpers for the scripts that cache per-document data on disk, keyed by the content
+# hash of the PDF so that a changed file never reuses stale results.
+
+
+CACHE_ROOT = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "pdf-skill")
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_path(kind, pdf_hash, suffix=".json"):
+    return os.path.join(CACHE_ROOT, kind, f"{pdf_hash}{suffix}")
+
+
+# Returns the parsed JSON at `path`, or None if it is missing or unreadable.
+def read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# Opens PDFs for the scripts. A long-running process (see pdf_worker.py) can replace
+# this with `set_pdf_opener` to hand out cached readers instead of parsing files again.
+def _open_pdf_uncached(path):
+    from pypdf import PdfReader
+    return PdfReader(path)
+
+
+_pdf_opener = _open_pdf_uncached
+
+
+def open_pdf(path):
+    return _pdf_opener(path)
+
+
+def set_pdf_opener(opener):
+    global _pdf_opener
+    _pdf_opener = opener or _open_pdf_uncached
+
+
+# Writes through a temporary file so concurrent readers never see a partial file.
+def write_json_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        # json.dumps uses the C encoder; json.dump to a file does not.
+        f.write(json.dumps(data))
+    os.replace(tmp_path, path)
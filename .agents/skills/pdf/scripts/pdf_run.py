@@ -0,0 +1,63 @@
+import json
+import os
+import socket
+import sys
+
+from pdf_cache import CACHE_ROOT
+
+
+# Runs a pdf skill script through a running pdf_worker.py when one is listening, and
+# directly otherwise, so the command line is the same either way:
+#   python scripts/pdf_run.py fill_fillable_fields.py <input pdf> <field_values.json> <output pdf>
+
+
+SOCKET_PATH = os.environ.get("PDF_WORKER_SOCKET") or os.path.join(CACHE_ROOT, "worker.sock")
+SCRIPTS = {
+    "check_bounding_boxes.py",
+    "check_fillable_fields.py",
+    "convert_pdf_to_images.py",
+    "create_validation_image.py",
+    "extract_form_field_info.py",
+    "fill_fillable_fields.py",
+    "fill_pdf_form_with_annotations.py",
+}
+
+
+# Returns the file name of a script given as e.g. "fill_fillable_fields",
+# "fill_fillable_fields.py" or "scripts/fill_fillable_fields.py", or None if it isn't
+# one of the scripts that can be run this way. pdf_worker.py uses the same function, so
+# a name is accepted or rejected the same way with or without a worker.
+def script_name(script):
+    script = os.path.basename(script)
+    if not script.endswith(".py"):
+        script += ".py"
+    return script if script in SCRIPTS else None
+
+
+def run_in_worker(sock, script, args):
+    request = {"script": script, "args": args, "cwd": os.getcwd()}
+    sock.sendall(json.dumps(request).encode() + b"\n")
+    with sock.makefile("rb") as f:
+        return json.loads(f.readline())
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: pdf_run.py [script name] [script arguments...]")
+        sys.exit(1)
+    script, args = script_name(sys.argv[1]), sys.argv[2:]
+    if script is None:
+        print(f"Unknown script: {sys.argv[1]}")
+        sys.exit(2)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(SOCKET_PATH)
+    except OSError:
+        # No worker running.
+        sock.close()
+        script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), script)
+        os.execv(sys.executable, [sys.executable, script_path] + args)
+    with sock:
+        response = run_in_worker(sock, script, args)
+    sys.stdout.write(response["output"])
+    sys.exit(response["exit_code"])
@@ -0,0 +1,132 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import runpy
+import socketserver
+import sys
+from collections import OrderedDict
+
+from pypdf import PdfReader
+
+import pdf_cache
+from fill_fillable_fields import monkeypatch_pydpf_method
+from pdf_run import SOCKET_PATH as DEFAULT_SOCKET_PATH, script_name
+
+
+# Long-running process that runs the pdf skill scripts without paying the interpreter,
+# pypdf/PIL/pdf2image import and PDF parsing costs on every call.
+#
+# Requests are JSON objects, one per line, read from stdin or from a Unix socket:
+#   {"script": "fill_fillable_fields.py", "args": ["in.pdf", "values.json", "out.pdf"], "cwd": "/some/dir"}
+# `args` are exactly the script's command line arguments. Each request gets one JSON line
+# back with the script's output and exit code:
+#   {"exit_code": 0, "output": "..."}
+# Parsed PDFs are kept in an LRU cache keyed by path, size and mtime, so a file that
+# changes on disk is parsed again. Use pdf_run.py to send requests from the command line.
+
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MAX_READERS = 8
+
+
+class ReaderCache:
+    def __init__(self, max_readers=DEFAULT_MAX_READERS):
+        self.max_readers = max_readers
+        self.readers = OrderedDict()
+
+    def open(self, path):
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        key = (path, stat.st_size, stat.st_mtime_ns)
+        reader = self.readers.get(key)
+        if reader is not None:
+            self.readers.move_to_end(key)
+            return reader
+        reader = PdfReader(path)
+        self.readers[key] = reader
+        while len(self.readers) > self.max_readers:
+            self.readers.popitem(last=False)
+        return reader
+
+
+def run_script(request):
+    script = script_name(request.get("script", ""))
+    if script is None:
+        return {"exit_code": 2, "output": f"Unknown script: {request.get('script')}\n"}
+
+    output = io.StringIO()
+    exit_code = 0
+    old_argv = sys.argv
+    old_cwd = os.getcwd()
+    sys.argv = [script] + [str(arg) for arg in request.get("args", [])]
+    try:
+        os.chdir(request.get("cwd") or old_cwd)
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            runpy.run_path(os.path.join(SCRIPTS_DIR, script), run_name="__main__")
+    except SystemExit as e:
+        if isinstance(e.code, int):
+            exit_code = e.code
+        elif e.code is not None:
+            output.write(f"{e.code}\n")
+            exit_code = 1
+    except Exception as e:
+        output.write(f"{type(e).__name__}: {e}\n")
+        exit_code = 1
+    finally:
+        sys.argv = old_argv
+        os.chdir(old_cwd)
+    return {"exit_code": exit_code, "output": output.getvalue()}
+
+
+def handle_line(line):
+    try:
+        request = json.loads(line)
+    except ValueError as e:
+        return {"exit_code": 2, "output": f"Invalid request: {e}\n"}
+    return run_script(request)
+
+
+def serve_stdio():
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        print(json.dumps(handle_line(line)), flush=True)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            self.wfile.write(json.dumps(handle_line(line.decode())).encode() + b"\n")
+            self.wfile.flush()
+
+
+def serve_socket(socket_path):
+    os.makedirs(os.path.dirname(socket_path) or ".", exist_ok=True)
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    # Requests are handled one at a time: scripts share sys.argv, the working directory
+    # and stdout.
+    with socketserver.UnixStreamServer(socket_path, _RequestHandler) as server:
+        print(f"pdf worker listening on {socket_path}", flush=True)
+        try:
+            server.serve_forever()
+        finally:
+            os.remove(socket_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs pdf skill scripts in a long-running process.")
+    parser.add_argument("--socket", nargs="?", const=DEFAULT_SOCKET_PATH, help=f"listen on a Unix socket instead of stdin (default path: {DEFAULT_SOCKET_PATH})")
+    parser.add_argument("--max-readers", type=int, default=DEFAULT_MAX_READERS, help="number of parsed PDFs to keep (default: %(default)s)")
+    args = parser.parse_args()
+
+    monkeypatch_pydpf_method()
+    pdf_cache.set_pdf_opener(ReaderCache(args.max_readers).open)
+    if args.socket:
+        serve_socket(args.socket)
+    else:
+        serve_stdio()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Skill Index Builder - Creates a compact index of the installed skills
+
+Reads the installed skills from .skill-lock.json and writes .skill-index.json next
+to it, with the name, description, path, folder hash and validation status of every
+skill. Skills whose skillFolderHash didn't change since the last run are copied from
+the previous index, so only new or updated skills have their SKILL.md read. The whole
+index is rebuilt when the validation rules change (quick_validate.CACHE_VERSION).
+
+Usage:
+    python build_skill_index.py [path/to/agents-directory] [--output path/to/index.json] [--force]
+
+Example:
+    python build_skill_index.py
+    python build_skill_index.py ~/.agents
+    python build_skill_index.py ~/.agents --output /tmp/skill-index.json
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from quick_validate import CACHE_VERSION as VALIDATOR_VERSION, load_frontmatter, validate_skill
+
+# Bump when the index format changes so that older indexes are rebuilt from scratch
+INDEX_VERSION = 1
+
+LOCK_FILENAME = '.skill-lock.json'
+INDEX_FILENAME = '.skill-index.json'
+
+
+def load_index(index_path):
+    """Return the skills of an existing index, or {} if there is no usable one."""
+    try:
+        index = json.loads(Path(index_path).read_text())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(index, dict) or index.get('version') != INDEX_VERSION:
+        return {}
+    # The valid/message of every entry is stale once the validation rules change
+    if index.get('validator_version') != VALIDATOR_VERSION:
+        return {}
+    return index.get('skills', {})
+
+
+def index_skill(agents_dir, name, folder_hash):
+    """
+    Build the index entry of one installed skill.
+
+    Returns:
+        Dict with the skill's name, description, path, hash and validation status
+    """
+    skill_path = Path(agents_dir) / 'skills' / name
+    entry = {
+        'name': name,
+        'description': '',
+        'path': (Path('skills') / name).as_posix(),
+        'hash': folder_hash,
+        'valid': False,
+        'message': '',
+    }
+
+    if not (skill_path / 'SKILL.md').is_file():
+        entry['message'] = "SKILL.md not found"
+        return entry
+
+    valid, message = validate_skill(skill_path)
+    entry['valid'] = valid
+    entry['message'] = message
+
+    # Invalid skills are still indexed with whatever their frontmatter provides
+    frontmatter, _ = load_frontmatter(skill_path / 'SKILL.md')
+    if frontmatter:
+        if isinstance(frontmatter.get('name'), str):
+            entry['name'] = frontmatter['name'].strip()
+        if isinstance(frontmatter.get('description'), str):
+            entry['description'] = frontmatter['description'].strip()
+    return entry
+
+
+def build_skill_index(agents_dir, index_path=None, force=False):
+    """
+    Build or update the skill index of an agents directory.
+
+    Args:
+        agents_dir: Directory containing .skill-lock.json and the skills/ folder
+        index_path: Optional index location (defaults to .skill-index.json in agents_dir)
+        force: Re-read every skill, even those whose folder hash didn't change
+
+    Returns:
+        Path to the index file, or None if error
+    """
+    agents_dir = Path(agents_dir).expanduser().resolve()
+    index_path = Path(index_path) if index_path else agents_dir / INDEX_FILENAME
+
+    lock_path = agents_dir / LOCK_FILENAME
+    try:
+        lock = json.loads(lock_path.read_text())
+    except FileNotFoundError:
+        print(f"❌ Error: {LOCK_FILENAME} not found in {agents_dir}")
+        return None
+    except ValueError as e:
+        print(f"❌ Error: Invalid JSON in {lock_path}: {e}")
+        return None
+
+    old_skills = {} if force else load_index(index_path)
+    skills = {}
+    rebuilt = []
+    for name, locked in sorted(lock.get('skills', {}).items()):
+        folder_hash = locked.get('skillFolderHash')
+        old = old_skills.get(name)
+        if old and folder_hash and old.get('hash') == folder_hash:
+            skills[name] = old
+            continue
+        skills[name] = index_skill(agents_dir, name, folder_hash)
+        rebuilt.append(name)
+
+    if skills == old_skills:
+        print(f"✅ Skill index is up to date: {index_path} ({len(skills)} skills)")
+        return index_path
+
+    index = {'version': INDEX_VERSION, 'validator_version': VALIDATOR_VERSION, 'skills': skills}
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(index, indent=1, ensure_ascii=False) + '\n')
+    os.replace(tmp_path, index_path)
+
+    for name in rebuilt:
+        status = "✅" if skills[name]['valid'] else "❌"
+        print(f"{status} {name}: {skills[name]['message']}")
+    print(f"\n📇 Indexed {len(skills)} skills ({len(rebuilt)} rebuilt) to: {index_path}")
+    return index_path
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build a compact index of the skills installed in an agents directory.",
+    )
+    parser.add_argument("agents_dir", nargs="?", default=Path.home() / '.agents',
+                        help="directory containing .skill-lock.json and skills/ (default: ~/.agents)")
+    parser.add_argument("--output", help="index file to write (default: .skill-index.json in agents_dir)")
+    parser.add_argument("--force", action="store_true", help="re-read every skill, even those whose folder hash didn't change")
+    args = parser.parse_args()
+
+    result = build_skill_index(args.agents_dir, args.output, args.force)
+
+    if result:
+        sys.exit(0)
+    else:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
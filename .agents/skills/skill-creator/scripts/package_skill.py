@@ -4,28 +4,397 @@ Skill Packager - Creates a distributable .skill file of a skill folder
 
 Usage:
     python utils/package_skill.py <path/to/skill-folder> [output-directory]
+    python utils/package_skill.py --all <path/to/skills-root> [output-directory]
 
 Example:
     python utils/package_skill.py skills/public/my-skill
     python utils/package_skill.py skills/public/my-skill ./dist
+    python utils/package_skill.py --all skills/public ./dist --workers 8
 """
 
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import re
+import struct
 import sys
+import time
 import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from quick_validate import validate_skill
+from quick_validate import find_skills, validate_skill
 
+# Bump when the manifest format changes so that older manifests are ignored
+MANIFEST_VERSION = 3
 
-def package_skill(skill_path, output_dir=None):
+# Files that are already compressed are stored as-is; deflating them again costs time
+# and saves next to nothing
+STORED_SUFFIXES = {
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.pdf', '.zip', '.gz', '.tgz', '.bz2', '.xz',
+    '.7z', '.skill', '.docx', '.xlsx', '.pptx', '.woff', '.woff2', '.mp3', '.mp4', '.webm',
+}
+
+# Files are read and written to the archive in chunks of this size, so memory use
+# doesn't grow with the size of the assets
+CHUNK_SIZE = 1024 * 1024
+
+# Patterns that are always excluded from packages, before the skill's own .skillignore
+DEFAULT_IGNORE_PATTERNS = [
+    '.git/', 'node_modules/', '__pycache__/', '*.py[cod]', '.DS_Store', '.skillignore',
+]
+
+# Deterministic archives give every member the same timestamp (the earliest one zip
+# can represent) and normalized permissions, and always use the same deflate level
+DETERMINISTIC_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+DETERMINISTIC_COMPRESSLEVEL = 6
+
+# Bytes sampled from each file to estimate its compressed size in --dry-run mode
+DRY_RUN_SAMPLE_SIZE = 64 * 1024
+
+
+def file_sha256(path):
+    """Return the hex sha256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def gitignore_pattern_to_regex(pattern):
+    """Translate the path part of a gitignore pattern into a regex string."""
+    regex = ''
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            regex += '(?:.*/)?'
+            i += 3
+        elif pattern.startswith('/**', i) and i + 3 == len(pattern):
+            regex += '/.*'
+            i += 3
+        elif pattern.startswith('**', i):
+            regex += '.*'
+            i += 2
+        elif pattern[i] == '*':
+            regex += '[^/]*'
+            i += 1
+        elif pattern[i] == '?':
+            regex += '[^/]'
+            i += 1
+        elif pattern[i] == '[' and ']' in pattern[i + 2:]:
+            end = pattern.index(']', i + 2)
+            body = pattern[i + 1:end]
+            if body[0] in '!^':
+                body = '^' + body[1:]
+            regex += '[' + body.replace('\\', '\\\\') + ']'
+            i = end + 1
+        elif pattern[i] == '\\' and i + 1 < len(pattern):
+            regex += re.escape(pattern[i + 1])
+            i += 2
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+    return regex
+
+
+def parse_ignore_patterns(lines):
+    """
+    Parse gitignore-style lines.
+
+    Returns:
+        List of (compiled regex, negated, directory only) tuples, in file order
+    """
+    rules = []
+    for line in lines:
+        line = line.rstrip('\n')
+        # Trailing spaces are ignored unless escaped
+        if not line.endswith('\\ '):
+            line = line.rstrip(' ')
+        if not line or line.startswith('#'):
+            continue
+        negated = line.startswith('!')
+        if negated:
+            line = line[1:]
+        elif line.startswith('\\#') or line.startswith('\\!'):
+            line = line[1:]
+        directory_only = line.endswith('/')
+        line = line.rstrip('/')
+        if not line:
+            continue
+        # A slash at the start or in the middle anchors the pattern to the skill folder,
+        # otherwise it matches at any depth
+        if '/' in line:
+            regex = gitignore_pattern_to_regex(line.lstrip('/'))
+        else:
+            regex = '(?:.*/)?' + gitignore_pattern_to_regex(line)
+        rules.append((re.compile(regex + r'\Z', re.DOTALL), negated, directory_only))
+    return rules
+
+
+def is_ignored(rules, rel_path, is_dir):
+    """Apply gitignore rules to a path relative to the skill folder; the last match wins."""
+    ignored = False
+    for regex, negated, directory_only in rules:
+        if directory_only and not is_dir:
+            continue
+        if regex.match(rel_path):
+            ignored = not negated
+    return ignored
+
+
+def load_ignore_rules(skill_path):
+    """Return the default ignore rules followed by the skill's own .skillignore, if any."""
+    lines = list(DEFAULT_IGNORE_PATTERNS)
+    try:
+        lines += (skill_path / '.skillignore').read_text().splitlines()
+    except FileNotFoundError:
+        pass
+    return parse_ignore_patterns(lines)
+
+
+def iter_skill_files(skill_path, ignored=None):
+    """
+    Yield the files of a skill that are not excluded by its ignore rules.
+
+    Ignored directories are not descended into. If `ignored` is a list, the ignored
+    paths relative to the skill folder are appended to it (directories with a
+    trailing slash).
+    """
+    rules = load_ignore_rules(skill_path)
+    for dirpath, dirnames, filenames in os.walk(skill_path):
+        rel_dir = Path(dirpath).relative_to(skill_path).as_posix()
+        prefix = '' if rel_dir == '.' else rel_dir + '/'
+        kept = []
+        for dirname in sorted(dirnames):
+            if is_ignored(rules, prefix + dirname, True):
+                if ignored is not None:
+                    ignored.append(prefix + dirname + '/')
+            else:
+                kept.append(dirname)
+        dirnames[:] = kept
+        for filename in sorted(filenames):
+            file_path = Path(dirpath) / filename
+            if not file_path.is_file():
+                continue
+            if is_ignored(rules, prefix + filename, False):
+                if ignored is not None:
+                    ignored.append(prefix + filename)
+            else:
+                yield file_path
+
+
+def manifest_path_for(skill_filename):
+    """Return the path of the manifest stored alongside a .skill file."""
+    return skill_filename.with_name(skill_filename.name + '.manifest.json')
+
+
+def load_manifest(skill_filename, settings):
+    """
+    Load the manifest of an existing .skill file.
+
+    Returns:
+        The manifest dict, or None if there is no usable manifest: it is missing,
+        from another version, written with other settings (compression level,
+        deterministic mode), or the archive was changed since the manifest was written
+    """
+    try:
+        manifest = json.loads(manifest_path_for(skill_filename).read_text())
+        archive_stat = skill_filename.stat()
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+        return None
+    if manifest.get('settings') != settings:
+        return None
+    if manifest.get('archive') != {'size': archive_stat.st_size, 'mtime_ns': archive_stat.st_mtime_ns}:
+        return None
+    return manifest
+
+
+def save_manifest(skill_filename, settings, files, archive_sha256):
+    archive_stat = skill_filename.stat()
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'settings': settings,
+        'archive': {'size': archive_stat.st_size, 'mtime_ns': archive_stat.st_mtime_ns},
+        'archive_sha256': archive_sha256,
+        'files': files,
+    }
+    manifest_path = manifest_path_for(skill_filename)
+    tmp_path = manifest_path.with_name(manifest_path.name + '.tmp')
+    tmp_path.write_text(json.dumps(manifest, indent=1, sort_keys=True))
+    os.replace(tmp_path, manifest_path)
+
+
+def scan_skill_files(skill_path, old_files):
+    """
+    Stat every file of a skill and work out its sha256 and permission bits.
+
+    Files whose size and mtime match the old manifest reuse its hash without being
+    read, and files that are in the old manifest are hashed to find out whether they
+    changed. New files are left with a None hash, which is filled in while they are
+    written to the archive. The permission bits are recorded because they end up in the
+    member's header: a chmod changes the archive even though the contents and mtime
+    stay the same.
+
+    Returns:
+        Dict of arcname -> (file path, manifest entry)
+    """
+    files = {}
+    for file_path in iter_skill_files(skill_path):
+        # Calculate the relative path within the zip
+        arcname = file_path.relative_to(skill_path.parent).as_posix()
+        stat = file_path.stat()
+        old = old_files.get(arcname)
+        if not old:
+            sha256 = None
+        elif old['size'] == stat.st_size and old['mtime_ns'] == stat.st_mtime_ns:
+            sha256 = old['sha256']
+        else:
+            sha256 = file_sha256(file_path)
+        files[arcname] = (file_path, {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'mode': stat.st_mode & 0o777,
+            'sha256': sha256,
+        })
+    # Members are always written in name order, so the archive doesn't depend on the walk order
+    return dict(sorted(files.items()))
+
+
+def write_member(zipf, file_path, arcname, deterministic=False):
+    """
+    Stream a file into the archive in CHUNK_SIZE pieces.
+
+    Already-compressed formats are stored, everything else uses the archive's
+    compression. In deterministic mode the member's timestamp and permissions
+    don't depend on the file system: 0644, or 0755 for executables.
+
+    Returns:
+        The hex sha256 of the file's contents
+    """
+    # The file's own timestamp is replaced in deterministic mode, so one that zip can't
+    # represent (before 1980) mustn't make packaging fail
+    zinfo = zipfile.ZipInfo.from_file(file_path, arcname, strict_timestamps=not deterministic)
+    if deterministic:
+        zinfo.date_time = DETERMINISTIC_DATE_TIME
+        zinfo.create_system = 3  # Unix, so that the permissions are read the same way everywhere
+        mode = 0o755 if zinfo.external_attr >> 16 & 0o111 else 0o644
+        zinfo.external_attr = (0o100000 | mode) << 16
+    if file_path.suffix.lower() in STORED_SUFFIXES:
+        zinfo.compress_type = zipfile.ZIP_STORED
+    else:
+        zinfo.compress_type = zipf.compression
+        # ZipFile.open(mode='w') takes no compression level; it reads this attribute,
+        # which is what ZipFile.write sets too. write() isn't used because the sha256
+        # would then need a second read of the file. (Python 3.13 names it
+        # compress_level and keeps _compresslevel as an alias.)
+        zinfo._compresslevel = zipf.compresslevel
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as src, zipf.open(zinfo, 'w', force_zip64=zinfo.file_size > zipfile.ZIP64_LIMIT) as dest:
+        for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+            dest.write(chunk)
+    return digest.hexdigest()
+
+
+def estimate_skill_size(skill_path, compresslevel=None, verbose=False):
+    """
+    Estimate the size of a skill's package without writing it.
+
+    The compressed size of each file is extrapolated from deflating its first
+    DRY_RUN_SAMPLE_SIZE bytes, plus the zip headers for every member.
+
+    Returns:
+        (number of files, total file bytes, estimated archive bytes, ignored paths)
+    """
+    ignored = []
+    num_files = total_bytes = estimated_bytes = 0
+    level = -1 if compresslevel is None else compresslevel
+    for file_path in iter_skill_files(skill_path, ignored):
+        arcname = file_path.relative_to(skill_path.parent).as_posix()
+        size = file_path.stat().st_size
+        compressed = size
+        if size and file_path.suffix.lower() not in STORED_SUFFIXES:
+            with open(file_path, 'rb') as f:
+                sample = f.read(DRY_RUN_SAMPLE_SIZE)
+            compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+            sample_compressed = len(compressor.compress(sample) + compressor.flush())
+            compressed = min(size, round(size * sample_compressed / len(sample)))
+        num_files += 1
+        total_bytes += size
+        # Local file header and central directory entry, both carrying the name
+        estimated_bytes += compressed + zipfile.sizeFileHeader + zipfile.sizeCentralDir + 2 * len(arcname.encode())
+        if verbose:
+            print(f"  Would add: {arcname} ({size} bytes, ~{compressed} compressed)")
+    estimated_bytes += zipfile.sizeEndCentDir
+    return num_files, total_bytes, estimated_bytes, ignored
+
+
+def copy_member(source, target, info):
+    """Copy a member between zip files without decompressing and recompressing it."""
+    source.fp.seek(info.header_offset)
+    header = source.fp.read(zipfile.sizeFileHeader)
+    name_length, extra_length = struct.unpack('<HH', header[26:30])
+    source.fp.seek(info.header_offset + zipfile.sizeFileHeader + name_length + extra_length)
+
+    new_info = zipfile.ZipInfo(info.filename, info.date_time)
+    new_info.compress_type = info.compress_type
+    new_info.create_system = info.create_system
+    new_info.external_attr = info.external_attr
+    new_info.flag_bits = info.flag_bits & ~0x08  # the sizes go in the local header, not a data descriptor
+    new_info.CRC = info.CRC
+    new_info.compress_size = info.compress_size
+    new_info.file_size = info.file_size
+    new_info.header_offset = target.fp.tell()
+    target.fp.write(new_info.FileHeader())
+
+    remaining = info.compress_size
+    while remaining:
+        chunk = source.fp.read(min(remaining, 1024 * 1024))
+        if not chunk:
+            raise zipfile.BadZipFile(f"Truncated member {info.filename}")
+        target.fp.write(chunk)
+        remaining -= len(chunk)
+
+    target.filelist.append(new_info)
+    target.NameToInfo[new_info.filename] = new_info
+    target.start_dir = target.fp.tell()
+    target._didModify = True
+
+
+def package_skill(skill_path, output_dir=None, compresslevel=None, verbose=False, force=False, dry_run=False,
+                  deterministic=False):
     """
     Package a skill folder into a .skill file.
 
+    A manifest with the size, mtime and sha256 of every packaged file is stored next
+    to the .skill file. When nothing changed since the last run packaging is skipped,
+    and when only some files changed the others are copied over from the previous
+    archive without being recompressed.
+
+    Files and directories matching the default ignore patterns or the skill's
+    .skillignore (gitignore syntax) are left out.
+
+    In deterministic mode, members are written with fixed timestamps, normalized
+    permissions and a fixed compression level, so that the same files always give a
+    byte-identical archive, and its sha256 is printed.
+
     Args:
         skill_path: Path to the skill folder
         output_dir: Optional output directory for the .skill file (defaults to current directory)
+        compresslevel: Optional deflate level from 0 to 9 (defaults to zlib's default)
+        verbose: Print every file added to the archive
+        force: Rebuild the archive from scratch even if it is up to date
+        dry_run: Only estimate the size of the package, without writing it
+        deterministic: Write a reproducible archive and print its sha256
 
     Returns:
-        Path to the created .skill file, or None if error
+        Path to the created (or, with dry_run, the would-be) .skill file, or None if error
     """
     skill_path = Path(skill_path).resolve()
 
@@ -63,18 +432,66 @@ def package_skill(skill_path, output_dir=None):
 
     skill_filename = output_path / f"{skill_name}.skill"
 
+    if deterministic and compresslevel is None:
+        compresslevel = DETERMINISTIC_COMPRESSLEVEL
+
+    if dry_run:
+        num_files, total_bytes, estimated_bytes, ignored = estimate_skill_size(skill_path, compresslevel, verbose)
+        if verbose:
+            for rel_path in ignored:
+                print(f"  Ignored: {rel_path}")
+        print(
+            f"📏 Would package {num_files} files ({total_bytes / 1024:.1f} KiB) to: {skill_filename} "
+            f"(~{estimated_bytes / 1024:.1f} KiB, {len(ignored)} ignored paths)"
+        )
+        return skill_filename
+
     # Create the .skill file (zip format)
     try:
-        with zipfile.ZipFile(skill_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # Walk through the skill directory
-            for file_path in skill_path.rglob('*'):
-                if file_path.is_file():
-                    # Calculate the relative path within the zip
-                    arcname = file_path.relative_to(skill_path.parent)
-                    zipf.write(file_path, arcname)
-                    print(f"  Added: {arcname}")
-
-        print(f"\n✅ Successfully packaged skill to: {skill_filename}")
+        settings = {'compresslevel': compresslevel, 'deterministic': deterministic}
+        manifest = None if force else load_manifest(skill_filename, settings)
+        old_files = manifest['files'] if manifest else {}
+        files = scan_skill_files(skill_path, old_files)
+        unchanged = {
+            arcname for arcname, (_, entry) in files.items()
+            if arcname in old_files
+            and old_files[arcname]['sha256'] == entry['sha256']
+            and old_files[arcname].get('mode') == entry['mode']
+        }
+
+        if manifest and len(unchanged) == len(files) == len(old_files):
+            new_files = {arcname: entry for arcname, (_, entry) in files.items()}
+            # The mtimes may have moved even though the contents didn't
+            if new_files != old_files:
+                save_manifest(skill_filename, settings, new_files, manifest['archive_sha256'])
+            print(f"✅ Skill is up to date: {skill_filename}")
+            if deterministic:
+                print(f"🔒 sha256: {manifest['archive_sha256']}")
+            return skill_filename
+
+        # Write next to the old archive so that its unchanged members can be copied over
+        tmp_filename = skill_filename.with_name(skill_filename.name + '.tmp')
+        old_zip = zipfile.ZipFile(skill_filename) if unchanged else None
+        try:
+            with zipfile.ZipFile(tmp_filename, 'w', zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as zipf:
+                for arcname, (file_path, entry) in files.items():
+                    if arcname in unchanged:
+                        copy_member(old_zip, zipf, old_zip.getinfo(arcname))
+                        continue
+                    entry['sha256'] = write_member(zipf, file_path, arcname, deterministic)
+                    if verbose:
+                        print(f"  Added: {arcname}")
+        finally:
+            if old_zip:
+                old_zip.close()
+        os.replace(tmp_filename, skill_filename)
+        archive_sha256 = file_sha256(skill_filename)
+        save_manifest(skill_filename, settings, {arcname: entry for arcname, (_, entry) in files.items()}, archive_sha256)
+
+        reused = f", {len(unchanged)} unchanged" if unchanged else ""
+        print(f"✅ Successfully packaged skill to: {skill_filename} ({len(files)} files{reused})")
+        if deterministic:
+            print(f"🔒 sha256: {archive_sha256}")
         return skill_filename
 
     except Exception as e:
@@ -82,25 +499,131 @@ def package_skill(skill_path, output_dir=None):
         return None
 
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: python utils/package_skill.py <path/to/skill-folder> [output-directory]")
-        print("\nExample:")
-        print("  python utils/package_skill.py skills/public/my-skill")
-        print("  python utils/package_skill.py skills/public/my-skill ./dist")
-        sys.exit(1)
+def _package_skill_quietly(skill_path, output_dir, compresslevel, verbose, force, dry_run, deterministic):
+    """Package one skill in a worker, returning its output instead of printing it."""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        result = package_skill(skill_path, output_dir, compresslevel, verbose, force, dry_run, deterministic)
+    return result, output.getvalue()
 
-    skill_path = sys.argv[1]
-    output_dir = sys.argv[2] if len(sys.argv) > 2 else None
 
-    print(f"📦 Packaging skill: {skill_path}")
-    if output_dir:
-        print(f"   Output directory: {output_dir}")
+def package_skills(root_dir, output_dir=None, workers=None, compresslevel=None, verbose=False, force=False, dry_run=False,
+                   deterministic=False):
+    """
+    Validate and package every skill below root_dir, using a pool of worker processes.
+
+    Args:
+        root_dir: Directory to search for skill folders
+        output_dir: Optional output directory for the .skill files (defaults to current directory)
+        workers: Number of worker processes (defaults to the number of CPUs)
+        compresslevel: Optional deflate level from 0 to 9 (defaults to zlib's default)
+        verbose: Print every file added to each archive
+        force: Rebuild every archive from scratch even if it is up to date
+        dry_run: Only estimate the size of each package, without writing it
+        deterministic: Write reproducible archives and print their sha256
+
+    Returns:
+        List of (skill folder, .skill file or None) tuples, in skill folder order
+    """
+    start = time.perf_counter()
+    skill_paths = find_skills(root_dir)
+    if not skill_paths:
+        print(f"❌ Error: No skills found in {root_dir}")
+        return []
+
+    # Skills are written to <output>/<folder name>.skill, so folder names must be unique
+    seen = {}
+    for skill_path in skill_paths:
+        if skill_path.name in seen:
+            print(f"❌ Error: Skills {seen[skill_path.name]} and {skill_path} would both be packaged as {skill_path.name}.skill")
+            return [(skill_path, None) for skill_path in skill_paths]
+        seen[skill_path.name] = skill_path
+
+    results = {}
+
+    def report(skill_path, result, output):
+        results[skill_path] = result
+        status = "✅" if result else "❌"
+        print(f"{status} {skill_path}")
+        # Only show the full log for failures, or for every skill when verbose, estimating
+        # sizes or printing hashes
+        if verbose or dry_run or deterministic or not result:
+            for line in output.strip().splitlines():
+                print(f"   {line}")
+
+    if workers is not None and workers <= 1:
+        for skill_path in skill_paths:
+            report(skill_path, *_package_skill_quietly(
+                skill_path, output_dir, compresslevel, verbose, force, dry_run, deterministic
+            ))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(
+                    _package_skill_quietly, skill_path, output_dir, compresslevel, verbose, force, dry_run, deterministic
+                ): skill_path
+                for skill_path in skill_paths
+            }
+            for future in as_completed(futures):
+                report(futures[future], *future.result())
+
+    elapsed = time.perf_counter() - start
+    packaged = [result for result in results.values() if result]
+    if dry_run:
+        print(f"\n📏 Estimated {len(packaged)}/{len(skill_paths)} skills in {elapsed:.2f}s")
+        return [(skill_path, results[skill_path]) for skill_path in skill_paths]
+    total_bytes = sum(os.path.getsize(result) for result in packaged)
+    print(
+        f"\n📦 Packaged {len(packaged)}/{len(skill_paths)} skills "
+        f"({total_bytes / 1024:.1f} KiB) in {elapsed:.2f}s"
+    )
+    return [(skill_path, results[skill_path]) for skill_path in skill_paths]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Package a skill folder, or every skill below a directory, into .skill files.",
+        epilog=(
+            "Example:\n"
+            "  python utils/package_skill.py skills/public/my-skill\n"
+            "  python utils/package_skill.py skills/public/my-skill ./dist\n"
+            "  python utils/package_skill.py --all skills/public ./dist --workers 8"
+        ),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("skill_path", help="skill folder, or the directory to search for skills with --all")
+    parser.add_argument("output_dir", nargs="?", help="output directory for the .skill files (default: current directory)")
+    parser.add_argument("--all", action="store_true", help="package every skill folder found below skill_path")
+    parser.add_argument("--workers", type=int, help="worker processes for --all (default: number of CPUs)")
+    parser.add_argument("--compression-level", type=int, choices=range(10), metavar="0-9", help="deflate level (default: zlib's default)")
+    parser.add_argument("--verbose", action="store_true", help="print every file added to the archives")
+    parser.add_argument("--force", action="store_true", help="rebuild archives from scratch even if they are up to date")
+    parser.add_argument("--dry-run", action="store_true", help="only estimate the size of the packages, without writing them")
+    parser.add_argument("--deterministic", action="store_true", help="write reproducible archives (sorted members, fixed timestamps, permissions and compression level) and print their sha256")
+    args = parser.parse_args()
+
+    if args.all:
+        print(f"📦 Packaging all skills in: {args.skill_path}")
+    else:
+        print(f"📦 Packaging skill: {args.skill_path}")
+    if args.output_dir:
+        print(f"   Output directory: {args.output_dir}")
     print()
 
-    result = package_skill(skill_path, output_dir)
+    options = dict(
+        compresslevel=args.compression_level,
+        verbose=args.verbose,
+        force=args.force,
+        dry_run=args.dry_run,
+        deterministic=args.deterministic,
+    )
+    if args.all:
+        results = package_skills(args.skill_path, args.output_dir, workers=args.workers, **options)
+        success = bool(results) and all(result for _, result in results)
+    else:
+        success = package_skill(args.skill_path, args.output_dir, **options) is not None
 
-    if result:
+    if success:
         sys.exit(0)
     else:
         sys.exit(1)
@@ -0,0 +1,155 @@
+import unittest
+import contextlib
+import hashlib
+import io
+import os
+import tempfile
+import zipfile
+from pathlib import Path
+import quick_validate
+from package_skill import is_ignored, package_skill, parse_ignore_patterns
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestDeterministicPackaging(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        # Keep the validation cache out of the user's ~/.cache
+        self.cache_path = quick_validate.CACHE_PATH
+        quick_validate.CACHE_PATH = self.root / 'validate.json'
+
+        self.skill_path = self.root / 'my-skill'
+        (self.skill_path / 'scripts').mkdir(parents=True)
+        (self.skill_path / 'SKILL.md').write_text(
+            "---\nname: my-skill\ndescription: A skill for testing packaging.\n---\n\n# My Skill\n"
+        )
+        (self.skill_path / 'scripts' / 'run.py').write_text("print('hello')\n")
+        (self.skill_path / 'scripts' / 'helper.py').write_text("VALUE = 1\n")
+        os.chmod(self.skill_path / 'scripts' / 'run.py', 0o644)
+
+    def tearDown(self):
+        quick_validate.CACHE_PATH = self.cache_path
+        self.tmp_dir.cleanup()
+
+    def build(self, output_dir, **kwargs):
+        """Helper to package the test skill quietly and return the archive's path"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            skill_filename = package_skill(self.skill_path, self.root / output_dir, **kwargs)
+        self.assertIsNotNone(skill_filename)
+        return skill_filename
+
+    def package(self, output_dir, **kwargs):
+        """Helper to package the test skill deterministically and return the archive's sha256"""
+        skill_filename = self.build(output_dir, deterministic=True, **kwargs)
+        return hashlib.sha256(skill_filename.read_bytes()).hexdigest()
+
+    def member_attributes(self, skill_filename):
+        """Helper to check an archive's CRCs and return the attributes of its members"""
+        with zipfile.ZipFile(skill_filename) as zipf:
+            self.assertIsNone(zipf.testzip())
+            return [
+                (info.filename, info.date_time, info.external_attr, info.create_system,
+                 info.compress_type, info.CRC, info.file_size)
+                for info in zipf.infolist()
+            ]
+
+    def test_unchanged_contents_give_same_hash(self):
+        """Test that touching files and packaging elsewhere doesn't change the archive"""
+        first = self.package('a')
+        os.utime(self.skill_path / 'scripts' / 'helper.py', (0, 0))
+        self.assertEqual(self.package('a'), first)
+        self.assertEqual(self.package('b'), first)
+
+    def test_incremental_matches_force_after_content_change(self):
+        """Test that an incremental rebuild after an edit matches a full rebuild"""
+        self.package('a')
+        (self.skill_path / 'scripts' / 'helper.py').write_text("VALUE = 2\n")
+        self.assertEqual(self.package('a'), self.package('b', force=True))
+
+    def test_incremental_matches_force_after_mode_change(self):
+        """Test that a chmod alone is picked up by an incremental rebuild"""
+        before = self.package('a')
+        os.chmod(self.skill_path / 'scripts' / 'run.py', 0o755)
+        incremental = self.package('a')
+        self.assertNotEqual(incremental, before)
+        self.assertEqual(incremental, self.package('b', force=True))
+
+    def test_non_deterministic_incremental_matches_force(self):
+        """Test that copied members of a regular incremental rebuild are intact and unchanged"""
+        self.build('a')
+        (self.skill_path / 'scripts' / 'helper.py').write_text("VALUE = 2\n")
+        os.chmod(self.skill_path / 'scripts' / 'run.py', 0o755)
+        incremental = self.member_attributes(self.build('a'))
+        self.assertEqual(incremental, self.member_attributes(self.build('b', force=True)))
+
+
+class TestIgnorePatterns(unittest.TestCase):
+
+    def assertIgnored(self, patterns, rel_path, is_dir=False):
+        self.assertTrue(is_ignored(parse_ignore_patterns(patterns), rel_path, is_dir),
+                        f"{patterns} should ignore {rel_path}")
+
+    def assertNotIgnored(self, patterns, rel_path, is_dir=False):
+        self.assertFalse(is_ignored(parse_ignore_patterns(patterns), rel_path, is_dir),
+                         f"{patterns} should not ignore {rel_path}")
+
+    def test_anchoring(self):
+        """Test that only patterns with a slash are anchored to the skill folder"""
+        self.assertIgnored(['build'], 'build')
+        self.assertIgnored(['build'], 'src/build')
+        self.assertIgnored(['/build'], 'build')
+        self.assertNotIgnored(['/build'], 'src/build')
+        self.assertIgnored(['docs/*.md'], 'docs/a.md')
+        self.assertNotIgnored(['docs/*.md'], 'src/docs/a.md')
+        self.assertNotIgnored(['docs/*.md'], 'docs/sub/a.md')
+        self.assertNotIgnored(['*.md'], 'a.md.bak')
+        self.assertNotIgnored(['?.py'], 'a/b.py/c')
+
+    def test_double_star(self):
+        """Test leading, trailing and middle ** patterns"""
+        self.assertIgnored(['**/cache'], 'cache', is_dir=True)
+        self.assertIgnored(['**/cache'], 'a/b/cache', is_dir=True)
+        self.assertIgnored(['logs/**'], 'logs/a/b.txt')
+        self.assertNotIgnored(['logs/**'], 'logs', is_dir=True)
+        self.assertIgnored(['a/**/b'], 'a/b')
+        self.assertIgnored(['a/**/b'], 'a/x/y/b')
+        self.assertNotIgnored(['a/**/b'], 'a/xb')
+
+    def test_negation(self):
+        """Test that a later ! pattern re-includes a path and that the last match wins"""
+        self.assertIgnored(['*.log'], 'x.log')
+        self.assertNotIgnored(['*.log', '!keep.log'], 'keep.log')
+        self.assertIgnored(['*.log', '!keep.log'], 'x.log')
+        self.assertIgnored(['!keep.log', '*.log'], 'keep.log')
+
+    def test_directory_only(self):
+        """Test that a trailing slash only matches directories"""
+        self.assertIgnored(['tmp/'], 'tmp', is_dir=True)
+        self.assertIgnored(['tmp/'], 'a/tmp', is_dir=True)
+        self.assertNotIgnored(['tmp/'], 'tmp')
+
+    def test_character_classes(self):
+        """Test ranges and both spellings of negated classes"""
+        self.assertIgnored(['file[0-9].txt'], 'file1.txt')
+        self.assertNotIgnored(['file[0-9].txt'], 'filea.txt')
+        self.assertIgnored(['file[!0-9].txt'], 'filea.txt')
+        self.assertNotIgnored(['file[!0-9].txt'], 'file1.txt')
+        self.assertIgnored(['file[^0-9].txt'], 'filea.txt')
+        self.assertNotIgnored(['file[^0-9].txt'], 'file1.txt')
+
+    def test_escapes(self):
+        """Test escaped wildcards, leading # and !, and trailing spaces"""
+        self.assertIgnored(['foo\\*'], 'foo*')
+        self.assertNotIgnored(['foo\\*'], 'foobar')
+        self.assertIgnored(['\\#notes'], '#notes')
+        self.assertNotIgnored(['#notes'], '#notes')
+        self.assertIgnored(['\\!important'], '!important')
+        self.assertIgnored(['name\\ '], 'name ')
+        self.assertIgnored(['name  '], 'name')
+        self.assertNotIgnored(['name  '], 'name ')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,40 +3,167 @@
 Quick validation script for skills - minimal version
 """
 
+import argparse
+import contextlib
+import json
 import sys
 import os
 import re
-import yaml
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-def validate_skill(skill_path):
-    """Basic validation of a skill"""
-    skill_path = Path(skill_path)
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
 
-    # Check SKILL.md exists
-    skill_md = skill_path / 'SKILL.md'
-    if not skill_md.exists():
-        return False, "SKILL.md not found"
+# Validation results are cached by SKILL.md path, size and mtime. Bump the version
+# whenever the validation rules change so that older results are ignored, both here
+# and in the skill index written by build_skill_index.py.
+CACHE_VERSION = 1
+CACHE_PATH = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'skill-creator' / 'validate.json'
+_cache_lock = threading.Lock()
+_cache = None
+
+FRONTMATTER_RE = re.compile(rb'^---\n(.*?)\n---', re.DOTALL)
+
+# Directories that never contain skills and can be large
+SKIPPED_DIRS = {'.git', 'node_modules', '__pycache__'}
+
+def read_frontmatter(skill_md, chunk_size=4096):
+    """
+    Read only the leading bytes of SKILL.md needed to extract its frontmatter.
+
+    Returns:
+        (frontmatter text, None) or (None, error message)
+    """
+    content = b''
+    with open(skill_md, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            content += chunk
+            # Match the universal newline handling of reading the file as text
+            text = content.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+            if not text.startswith(b'---'[:len(text)]):
+                return None, "No YAML frontmatter found"
+            # The earliest closing '---' can't move once it has been read
+            match = FRONTMATTER_RE.match(text)
+            if match:
+                return match.group(1).decode('utf-8'), None
+            if not chunk:
+                break
+    if not content.startswith(b'---'):
+        return None, "No YAML frontmatter found"
+    return None, "Invalid frontmatter format"
+
+def _read_cache():
+    try:
+        cache = json.loads(CACHE_PATH.read_text())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get('version') != CACHE_VERSION:
+        return {}
+    return cache.get('entries', {})
+
+@contextlib.contextmanager
+def _cache_file_lock():
+    """
+    Hold an exclusive lock on a file next to the cache, so that processes validating
+    at the same time (e.g. package_skill --all workers) update the cache one at a time.
+    Without fcntl, only threads of this process are kept apart.
+    """
+    if fcntl is None:
+        yield
+        return
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(CACHE_PATH.with_name(CACHE_PATH.name + '.lock'), 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _cache_result(key, entry):
+    """Add a result to the cache file, keeping entries written by other threads and processes"""
+    with _cache_lock:
+        try:
+            with _cache_file_lock():
+                entries = _read_cache()
+                entries[key] = entry
+                _cache.update(entries)
+                tmp_path = CACHE_PATH.with_name(f"{CACHE_PATH.name}.{os.getpid()}.tmp")
+                tmp_path.write_text(json.dumps({'version': CACHE_VERSION, 'entries': entries}))
+                os.replace(tmp_path, CACHE_PATH)
+        except OSError:
+            _cache[key] = entry
+
+def validate_skill(skill_path, use_cache=True):
+    """
+    Basic validation of a skill, reusing the cached result while SKILL.md is unchanged
+
+    Returns:
+        (valid, message) tuple
+    """
+    global _cache
+    skill_md = Path(skill_path).resolve() / 'SKILL.md'
+    if not use_cache:
+        return validate_skill_uncached(skill_path)
+    try:
+        stat = skill_md.stat()
+    except OSError:
+        return validate_skill_uncached(skill_path)
 
-    # Read and validate frontmatter
-    content = skill_md.read_text()
-    if not content.startswith('---'):
-        return False, "No YAML frontmatter found"
+    key = str(skill_md)
+    with _cache_lock:
+        if _cache is None:
+            _cache = _read_cache()
+        entry = _cache.get(key)
+    if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return entry['valid'], entry['message']
 
-    # Extract frontmatter
-    match = re.match(r'^---\n(.*?)\n---', content, re.DOTALL)
-    if not match:
-        return False, "Invalid frontmatter format"
+    valid, message = validate_skill_uncached(skill_path)
+    _cache_result(key, {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'valid': valid, 'message': message})
+    return valid, message
 
-    frontmatter_text = match.group(1)
+def load_frontmatter(skill_md):
+    """
+    Read and parse the YAML frontmatter of a SKILL.md file.
+
+    Returns:
+        (frontmatter dict, None) or (None, error message)
+    """
+    # Imported here so that runs answered entirely from the cache don't pay for it
+    import yaml
+    # libyaml's loader is much faster than the pure-Python one when PyYAML was built with it
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+    # Read and extract frontmatter
+    frontmatter_text, error = read_frontmatter(skill_md)
+    if error:
+        return None, error
 
     # Parse YAML frontmatter
     try:
-        frontmatter = yaml.safe_load(frontmatter_text)
+        frontmatter = yaml.load(frontmatter_text, Loader=loader)
         if not isinstance(frontmatter, dict):
-            return False, "Frontmatter must be a YAML dictionary"
+            return None, "Frontmatter must be a YAML dictionary"
     except yaml.YAMLError as e:
-        return False, f"Invalid YAML in frontmatter: {e}"
+        return None, f"Invalid YAML in frontmatter: {e}"
+    return frontmatter, None
+
+def validate_skill_uncached(skill_path):
+    """Basic validation of a skill"""
+    skill_path = Path(skill_path)
+
+    # Check SKILL.md exists
+    skill_md = skill_path / 'SKILL.md'
+    if not skill_md.exists():
+        return False, "SKILL.md not found"
+
+    frontmatter, error = load_frontmatter(skill_md)
+    if error:
+        return False, error
 
     # Define allowed properties
     ALLOWED_PROPERTIES = {'name', 'description', 'license', 'allowed-tools', 'metadata'}
@@ -85,11 +212,53 @@ def validate_skill(skill_path):
 
     return True, "Skill is valid!"
 
+def find_skills(*roots):
+    """Find every skill folder (a directory containing SKILL.md) below the given roots, sorted"""
+    skills = set()
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(Path(root).resolve()):
+            dirnames[:] = [d for d in dirnames if d not in SKIPPED_DIRS]
+            if 'SKILL.md' in filenames:
+                skills.add(Path(dirpath))
+    return sorted(skills)
+
+def validate_skills(roots, workers=None, use_cache=True):
+    """
+    Validate every skill below the given roots in a thread pool.
+
+    Returns:
+        Summary dict with the counts and a result per skill
+    """
+    skill_paths = find_skills(*roots)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(lambda skill_path: validate_skill(skill_path, use_cache), skill_paths))
+    skills = [
+        {'path': str(skill_path), 'valid': valid, 'message': message}
+        for skill_path, (valid, message) in zip(skill_paths, results)
+    ]
+    num_valid = sum(1 for skill in skills if skill['valid'])
+    return {
+        'total': len(skills),
+        'valid': num_valid,
+        'invalid': len(skills) - num_valid,
+        'skills': skills,
+    }
+
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python quick_validate.py <skill_directory>")
-        sys.exit(1)
-    
-    valid, message = validate_skill(sys.argv[1])
+    parser = argparse.ArgumentParser(description="Validate a skill, or every skill below one or more directories.")
+    parser.add_argument("paths", nargs="+", metavar="skill_directory", help="skill folder, or directories to search for skills with --all")
+    parser.add_argument("--all", action="store_true", help="validate every skill found below the given directories and print a JSON summary")
+    parser.add_argument("--workers", type=int, help="validation threads for --all (default: Python's default)")
+    parser.add_argument("--no-cache", action="store_true", help=f"ignore and don't update the results cached in {CACHE_PATH}")
+    args = parser.parse_args()
+
+    if args.all:
+        summary = validate_skills(args.paths, args.workers, not args.no_cache)
+        print(json.dumps(summary, indent=2))
+        sys.exit(0 if summary['total'] and not summary['invalid'] else 1)
+
+    if len(args.paths) != 1:
+        parser.error("expected a single skill directory (use --all for several)")
+    valid, message = validate_skill(args.paths[0], not args.no_cache)
     print(message)
     sys.exit(0 if valid else 1)
\ No newline at end of file
@@ -0,0 +1,69 @@
+import unittest
+import tempfile
+from pathlib import Path
+from quick_validate import read_frontmatter
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestReadFrontmatter(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.skill_md = Path(self.tmp_dir.name) / 'SKILL.md'
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def read(self, content, chunk_size=4096):
+        """Helper to write SKILL.md as bytes and read its frontmatter"""
+        self.skill_md.write_bytes(content)
+        return read_frontmatter(self.skill_md, chunk_size)
+
+    def test_frontmatter(self):
+        """Test that only the text between the opening and the first closing --- is returned"""
+        content = b"---\nname: my-skill\ndescription: Test\n---\n\n# My Skill\n---\n"
+        self.assertEqual(self.read(content), ("name: my-skill\ndescription: Test", None))
+
+    def test_crlf(self):
+        """Test that CRLF and CR line endings are read like LF ones"""
+        expected = ("name: my-skill\ndescription: Test", None)
+        self.assertEqual(self.read(b"---\r\nname: my-skill\r\ndescription: Test\r\n---\r\n# Body\r\n"), expected)
+        self.assertEqual(self.read(b"---\rname: my-skill\rdescription: Test\r---\r"), expected)
+
+    def test_every_chunk_boundary(self):
+        """Test that splitting the file anywhere (inside ---, CRLF or UTF-8) reads like one chunk"""
+        samples = [
+            b"---\nname: my-skill\ndescription: Test\n---\n# Body\n",
+            b"---\r\nname: my-skill\r\ndescription: Caf\xc3\xa9\r\n---\r\n",
+            b"---\nname: my-skill\n-- not the end\n---\n",
+            b"---\nname: my-skill\n",
+        ]
+        for content in samples:
+            expected = self.read(content, chunk_size=len(content) + 1)
+            for chunk_size in range(1, len(content) + 1):
+                with self.subTest(content=content, chunk_size=chunk_size):
+                    self.assertEqual(self.read(content, chunk_size), expected)
+
+    def test_frontmatter_longer_than_chunk_size(self):
+        """Test that frontmatter spanning many chunks is read in full"""
+        description = 'word ' * 5000
+        content = f"---\nname: my-skill\ndescription: {description}\n---\n".encode()
+        self.assertEqual(self.read(content, chunk_size=64),
+                         (f"name: my-skill\ndescription: {description}", None))
+
+    def test_empty_file(self):
+        """Test that an empty SKILL.md has no frontmatter"""
+        self.assertEqual(self.read(b""), (None, "No YAML frontmatter found"))
+
+    def test_missing_frontmatter(self):
+        """Test that the file is rejected from its first bytes when it doesn't start with ---"""
+        self.assertEqual(self.read(b"# My Skill\n---\nname: x\n---\n", chunk_size=1), (None, "No YAML frontmatter found"))
+
+    def test_unclosed_frontmatter(self):
+        """Test that frontmatter without a closing --- is invalid"""
+        self.assertEqual(self.read(b"---\nname: my-skill\n", chunk_size=4), (None, "Invalid frontmatter format"))
+        self.assertEqual(self.read(b"---"), (None, "Invalid frontmatter format"))
+
+
+if __name__ == '__main__':
+    unittest.main()